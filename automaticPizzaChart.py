@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 from mplsoccer import PyPizza, FontManager
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from donnees_joueurs import charger_joueurs
+from percentiles import CleCohorte, get_percentile_store, matrice_percentiles, version_fichier
 
 # ---------------------- PARAMÈTRES DU RADAR ----------------------
 
@@ -30,6 +31,8 @@ RAW_STATS = {
     "Dégagements": "Dégagements"
 }
 
+DATA_FILE = "df_BIG2025.csv"
+
 # ---------------------- COULEURS ----------------------
 
 COLOR_1 = "#1A78CF"
@@ -38,36 +41,22 @@ SLICE_COLORS = [COLOR_1] * len(RAW_STATS)
 
 # ---------------------- FONCTIONS ----------------------
 
-def calculate_percentiles(player_name, df):
-    player = df[df["Joueur"] == player_name].iloc[0]
-    percentiles = []
-
-    for label, col in RAW_STATS.items():
-        try:
-            if col not in df.columns or pd.isna(player[col]):
-                percentile = 0
-            elif "par 90 minutes" in col or "%" in col:
-                val = player[col]
-                dist = df[col]
-                if pd.isna(val) or dist.dropna().empty:
-                    percentile = 0
-                else:
-                    percentile = round((dist < val).mean() * 100)
-            else:
-                if player["Matchs en 90 min"] == 0:
-                    percentile = 0
-                else:
-                    val = player[col] / player["Matchs en 90 min"]
-                    dist = df[col] / df["Matchs en 90 min"]
-                    if pd.isna(val) or dist.dropna().empty:
-                        percentile = 0
-                    else:
-                        percentile = round((dist < val).mean() * 100)
-        except Exception as e:
-            percentile = 0
-        percentiles.append(percentile)
-
-    return percentiles
+def percentiles_competition(ligue):
+    """Matrice des centiles de tous les joueurs d'une compétition (store partagé)"""
+    cle = CleCohorte(version_fichier(DATA_FILE), ligue, None, None,
+                     tuple(RAW_STATS.values()), "strictement_inferieur")
+
+    def calcul():
+        df_ligue = df[df["Compétition"] == ligue]
+        matrice = matrice_percentiles(df_ligue, list(RAW_STATS.values()))
+        matrice.index = df_ligue["Joueur"].astype(str).values
+        return matrice[~matrice.index.duplicated(keep="first")]
+
+    return get_percentile_store().get(cle, calcul)
+
+
+def calculate_percentiles(player_name, ligue):
+    return percentiles_competition(ligue).loc[player_name].tolist()
 
 
 # ---------------------- APP STREAMLIT ----------------------
@@ -75,8 +64,8 @@ def calculate_percentiles(player_name, df):
 st.set_page_config(layout="wide", page_title="Radar de joueurs")
 st.title("📊 Radar de performance - Top 5 Championnat Européen  - Saison 2024/25")
 
-# Charger les données
-df = pd.read_csv("df_BIG2025.csv", sep=",")
+# Charger les données (lues et typées une fois par processus)
+df = charger_joueurs(DATA_FILE)
 ligues = df["Compétition"].unique()
 
 # Choix du mode
@@ -96,8 +85,7 @@ if mode == "Radar individuel":
 
     if joueur1:
         st.subheader(f"🎯 Radar individuel : {joueur1}")
-        df_j1 = df[df["Compétition"] == ligue1]
-        values1 = calculate_percentiles(joueur1, df_j1)
+        values1 = calculate_percentiles(joueur1, ligue1)
 
         baker = PyPizza(
             params=list(RAW_STATS.keys()),
@@ -143,10 +131,8 @@ elif mode == "Radar comparatif":
 
     if joueur1 and joueur2:
         st.subheader(f"⚔️ Radar comparatif : {joueur1} vs {joueur2}")
-        df_j1 = df[df["Compétition"] == ligue1]
-        df_j2 = df[df["Compétition"] == ligue2]
-        values1 = calculate_percentiles(joueur1, df_j1)
-        values2 = calculate_percentiles(joueur2, df_j2)
+        values1 = calculate_percentiles(joueur1, ligue1)
+        values2 = calculate_percentiles(joueur2, ligue2)
 
         params_offset = [False] * len(RAW_STATS)
         params_offset[9] = True
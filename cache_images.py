@@ -0,0 +1,121 @@
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+# Cache des logos et photos FotMob (disque + mémoire)
+DOSSIER_IMAGES = os.environ.get('IMAGES_CACHE_DIR', 'cache_images')
+TIMEOUT_IMAGE = 3
+TTL_ECHEC = 24 * 3600
+NB_IMAGES_MEMOIRE = 512
+NB_WORKERS_IMAGES = 16
+
+
+def url_logo_equipe(team_id):
+    return f'https://images.fotmob.com/image_resources/logo/teamlogo/{team_id:.0f}.png'
+
+
+def url_photo_joueur(player_id):
+    return f'https://images.fotmob.com/image_resources/playerimages/{player_id}.png'
+
+
+def url_logo_ligue(league_id):
+    return f'https://images.fotmob.com/image_resources/logo/leaguelogo/{league_id}.png'
+
+
+class AssetStore:
+    """Images décodées en mémoire (LRU) et brutes sur disque.
+
+    Un téléchargement en échec est mémorisé (fichier .miss) pendant
+    `ttl_echec` secondes : une image absente n'est jamais redemandée
+    au réseau à chaque rendu.
+    """
+
+    def __init__(self, dossier=DOSSIER_IMAGES, timeout=TIMEOUT_IMAGE,
+                 ttl_echec=TTL_ECHEC, taille_memoire=NB_IMAGES_MEMOIRE):
+        self.dossier = dossier
+        self.timeout = timeout
+        self.ttl_echec = ttl_echec
+        self.taille_memoire = taille_memoire
+        self._memoire = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _chemin(self, url):
+        cle = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.dossier, cle[:2], cle)
+
+    def _memoriser(self, url, image):
+        with self._lock:
+            self._memoire[url] = image
+            self._memoire.move_to_end(url)
+            while len(self._memoire) > self.taille_memoire:
+                self._memoire.popitem(last=False)
+
+    def _echec_recent(self, chemin):
+        try:
+            return time.time() - os.path.getmtime(f"{chemin}.miss") < self.ttl_echec
+        except OSError:
+            return False
+
+    def _telecharger(self, url, chemin):
+        """Télécharge vers le disque ; renvoie False (et note l'échec) sinon"""
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        try:
+            requete = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+            with urllib.request.urlopen(requete, timeout=self.timeout) as response:
+                contenu = response.read()
+            Image.open(io.BytesIO(contenu)).verify()
+        except Exception:
+            with open(f"{chemin}.miss", 'w'):
+                pass
+            return False
+        tmp = f"{chemin}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(contenu)
+        os.replace(tmp, chemin)
+        return True
+
+    def get(self, url):
+        """Image PIL décodée pour `url`, ou None si elle est indisponible"""
+        with self._lock:
+            if url in self._memoire:
+                self._memoire.move_to_end(url)
+                return self._memoire[url]
+
+        chemin = self._chemin(url)
+        if not os.path.exists(chemin):
+            if self._echec_recent(chemin) or not self._telecharger(url, chemin):
+                return None
+
+        try:
+            image = Image.open(chemin)
+            image.load()
+        except Exception:
+            return None
+        self._memoriser(url, image)
+        return image
+
+    def prefetch(self, urls, max_workers=NB_WORKERS_IMAGES):
+        """Charge en parallèle toutes les images manquantes"""
+        manquantes = [url for url in dict.fromkeys(urls) if url not in self._memoire]
+        if not manquantes:
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.get, manquantes))
+
+
+_store = None
+
+
+def get_asset_store():
+    """Store partagé par le processus"""
+    global _store
+    if _store is None:
+        _store = AssetStore()
+    return _store
@@ -0,0 +1,60 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Taille maximale du cache de shotmaps rendues (Mo)
+TAILLE_MAX_MO = int(os.environ.get('SHOTMAP_CACHE_MO', 256))
+
+
+class CacheRendu:
+    """Cache LRU d'images rendues (octets PNG), borné en taille totale.
+
+    Une seule instance est partagée entre toutes les sessions Streamlit
+    (via st.cache_resource), d'où le verrou.
+    """
+
+    def __init__(self, taille_max=TAILLE_MAX_MO * 1024 * 1024):
+        self.taille_max = taille_max
+        self.taille = 0
+        self._entrees = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cle):
+        """Renvoie les octets en cache (et les marque récents), ou None"""
+        with self._lock:
+            png = self._entrees.get(cle)
+            if png is not None:
+                self._entrees.move_to_end(cle)
+            return png
+
+    def put(self, cle, png):
+        """Ajoute une image et évince les moins récemment utilisées"""
+        if len(png) > self.taille_max:
+            return
+        with self._lock:
+            ancien = self._entrees.pop(cle, None)
+            if ancien is not None:
+                self.taille -= len(ancien)
+            self._entrees[cle] = png
+            self.taille += len(png)
+            while self.taille > self.taille_max:
+                _, evince = self._entrees.popitem(last=False)
+                self.taille -= len(evince)
+
+    def __len__(self):
+        return len(self._entrees)
+
+
+def empreinte_theme(theme):
+    """Empreinte stable d'un thème de couleurs"""
+    return hashlib.sha256(json.dumps(theme, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def figure_en_png(fig):
+    """Sérialise une figure comme st.pyplot (PNG, bbox serrée, 200 dpi)"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=200)
+    return buffer.getvalue()
@@ -0,0 +1,128 @@
+import os
+
+import pandas as pd
+
+from stockage_tirs import get_parquet_path, parse_filename
+
+# Un classement = une ligne par (joueur, équipe) avec tirs, buts et xG cumulés
+CLES_CLASSEMENT = ['joueur_id', 'joueur', 'equipe_id', 'equipe_joueur']
+CRITERES = {
+    "Top Tireurs": 'tirs',
+    "Meilleurs Buteurs": 'buts',
+    "Meilleur xG": 'xg',
+}
+
+
+def get_classement_path(csv_path):
+    """Chemin du classement matérialisé, à côté de la partition Parquet"""
+    slug, season = parse_filename(csv_path)
+    return os.path.join(os.path.dirname(get_parquet_path(slug, season)), 'classement.parquet')
+
+
+def construire_classement(data):
+    """Agrège les tirs (hors penalties) en une seule passe groupby"""
+    data = data[data['situation'] != 'Penalty']
+    agg = data.assign(but=(data['type_evenement'] == 'Goal').astype('int64')).groupby(
+        CLES_CLASSEMENT, observed=True, sort=False
+    ).agg(
+        saison=('saison', 'first'),
+        tirs=('joueur_id', 'size'),
+        buts=('but', 'sum'),
+        xg=('xg', 'sum'),
+    ).reset_index()
+    return _normaliser(agg)
+
+
+def fusionner_classement(classement, ajout):
+    """Fusionne deux classements (les compteurs sont additifs)"""
+    fusion = pd.concat([classement, ajout], ignore_index=True).groupby(
+        CLES_CLASSEMENT, sort=False
+    ).agg(
+        saison=('saison', 'first'),
+        tirs=('tirs', 'sum'),
+        buts=('buts', 'sum'),
+        xg=('xg', 'sum'),
+    ).reset_index()
+    return _normaliser(fusion)
+
+
+class AccumulateurClassement:
+    """Agrège au fil de la collecte les tirs d'une poignée de matchs.
+
+    La mémoire reste proportionnelle au nombre de joueurs, pas de tirs.
+    """
+
+    def __init__(self):
+        self._lignes = {}
+
+    def ajouter(self, shots):
+        for shot in shots:
+            if shot.get('situation') == 'Penalty' or shot.get('joueur_id') is None:
+                continue
+            cle = tuple(shot[col] for col in CLES_CLASSEMENT)
+            ligne = self._lignes.setdefault(cle, [shot.get('saison'), 0, 0, 0.0])
+            ligne[1] += 1
+            ligne[2] += shot.get('type_evenement') == 'Goal'
+            xg = shot.get('xg')
+            if xg is not None and xg == xg:
+                ligne[3] += xg
+
+    def to_frame(self):
+        lignes = [(*cle, saison, tirs, buts, xg) for cle, (saison, tirs, buts, xg) in self._lignes.items()]
+        return _normaliser(pd.DataFrame(lignes, columns=CLES_CLASSEMENT + ['saison', 'tirs', 'buts', 'xg']))
+
+
+def _normaliser(classement):
+    """Types simples et stables pour pouvoir fusionner des classements"""
+    return classement.astype({
+        'joueur_id': 'int64', 'joueur': 'str', 'equipe_id': 'int64', 'equipe_joueur': 'str',
+        'saison': 'str', 'tirs': 'int64', 'buts': 'int64', 'xg': 'float64',
+    })
+
+
+def classement_a_jour(csv_path):
+    """Le classement sur disque reflète-t-il le CSV actuel ?"""
+    path = get_classement_path(csv_path)
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path)
+
+
+def sauvegarder_classement(csv_path, classement):
+    """Écrit le classement matérialisé (ignoré sans pyarrow)"""
+    path = get_classement_path(csv_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        classement.to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+    except ImportError:
+        pass
+
+
+def charger_classement(csv_path, charger_donnees):
+    """Charge le classement matérialisé, ou le reconstruit via `charger_donnees()`"""
+    if classement_a_jour(csv_path):
+        return pd.read_parquet(get_classement_path(csv_path))
+    classement = construire_classement(charger_donnees())
+    sauvegarder_classement(csv_path, classement)
+    return classement
+
+
+def mettre_a_jour_classement(csv_path, ajout, etait_a_jour):
+    """Met à jour le classement après un ajout de tirs au CSV.
+
+    Si le classement était synchronisé avec le CSV avant l'ajout, le
+    classement `ajout` des nouveaux tirs y est fusionné ; sinon il sera
+    reconstruit au prochain chargement.
+    """
+    if etait_a_jour:
+        classement = pd.read_parquet(get_classement_path(csv_path))
+        sauvegarder_classement(csv_path, fusionner_classement(classement, ajout))
+
+
+def trier_classement(classement, critere, equipe=None):
+    """Classement trié selon un critère ('tirs', 'buts' ou 'xg'), colonne Total"""
+    if equipe is not None:
+        classement = classement[classement['equipe_joueur'] == equipe]
+    if critere == 'buts':
+        classement = classement[classement['buts'] > 0]
+    trie = classement.assign(Total=classement[critere])
+    return trie.sort_values(by='Total', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,320 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+import streamlit as st
+
+# Paramètres de collecte
+NB_WORKERS = 8
+REQUETES_PAR_SECONDE = 8.0
+RAFALE_MAX = 8
+
+# Cache disque des réponses (FOTMOB_OFFLINE=1 pour rejouer sans réseau)
+CACHE_DIR = os.environ.get('FOTMOB_CACHE_DIR', 'cache_fotmob')
+TTL_LISTE_MATCHS = 3600
+
+HEADERS = {
+    'sec-ch-ua-platform': '"Windows"',
+    'Referer': 'https://www.fotmob.com/',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'x-mas': 'eyJib2R5Ijp7InVybCI6Ii9hcGkvZGF0YS9sZWFndWVzP2lkPTUzJmNjb2RlMz1GUkEmc2Vhc29uPTIwMjQlMkYyMDI1IiwiY29kZSI6MTc2NTU0MTU0MzgyOSwiZm9vIjoicHJvZHVjdGlvbjo2YzZiN2M5M2Y1OTE0MDg0ZmYwM2IzMzIwMzRlMzE3MThkZWRjYjYzIn0sInNpZ25hdHVyZSI6IjRFOUZFRjA4RDYwNEM3NERCMkQxMDgzQ0YwMDEzNUI3In0=',
+    'sec-ch-ua': '"Chromium";v="122", "Google Chrome";v="122"',
+    'sec-ch-ua-mobile': '?0'
+}
+
+_local = threading.local()
+
+
+class TokenBucket:
+    """Limiteur de débit : au plus `rate` requêtes/s avec des rafales de `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                attente = (1 - self.tokens) / self.rate
+            time.sleep(attente)
+
+
+class HorsLigneError(Exception):
+    """Réponse absente du cache alors que le mode hors-ligne est actif"""
+
+
+class CacheReponses:
+    """Cache disque des réponses JSON, adressé par le SHA-256 de l'URL.
+
+    `ttl` (secondes, None = illimité) s'applique par défaut à toutes les
+    lectures. En mode `offline`, le TTL est ignoré et aucun appel réseau
+    n'est effectué : une absence du cache lève `HorsLigneError`.
+    """
+
+    def __init__(self, dossier=CACHE_DIR, ttl=None, offline=False):
+        self.dossier = dossier
+        self.ttl = ttl
+        self.offline = offline
+
+    def _chemin(self, url):
+        cle = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.dossier, cle[:2], f"{cle}.json")
+
+    def lire(self, url, ttl=None):
+        """Renvoie le JSON en cache pour `url`, ou None s'il est absent ou expiré"""
+        path = self._chemin(url)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        ttl = self.ttl if ttl is None else ttl
+        if not self.offline and ttl is not None and time.time() - entry['date'] > ttl:
+            return None
+        return entry['contenu']
+
+    def ecrire(self, url, contenu):
+        """Enregistre une réponse (écriture atomique, sûre entre threads)"""
+        path = self._chemin(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'date': time.time(), 'contenu': contenu}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+# Mode hors-ligne par défaut (FOTMOB_OFFLINE=1)
+HORS_LIGNE_DEFAUT = os.environ.get('FOTMOB_OFFLINE') == '1'
+
+# Cache par défaut des fonctions de collecte. Jamais remplacé : une collecte
+# avec d'autres réglages (p. ex. hors-ligne pour une session) passe son
+# propre CacheReponses via le paramètre `cache`, sans toucher aux autres.
+_cache = CacheReponses(offline=HORS_LIGNE_DEFAUT)
+
+
+def _session():
+    """Session HTTP propre à chaque thread (réutilisation des connexions)"""
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+        _local.session.headers.update(HEADERS)
+    return _local.session
+
+
+def requete_json(url, ttl=None, limiter=None, cache=None):
+    """GET JSON via le cache (`_cache` par défaut) ; le limiteur ne s'applique qu'aux appels réseau"""
+    cache = cache or _cache
+    contenu = cache.lire(url, ttl=ttl)
+    if contenu is not None:
+        return contenu
+    if cache.offline:
+        raise HorsLigneError(f"Absent du cache : {url}")
+
+    if limiter:
+        limiter.acquire()
+    response = _session().get(url, timeout=10)
+    response.raise_for_status()
+    contenu = response.json()
+    cache.ecrire(url, contenu)
+    return contenu
+
+
+def get_filename(league_slug, season):
+    """Génère le nom de fichier pour une ligue et saison"""
+    season_clean = season.replace('/', '_')
+    return f"tirs_{league_slug}_{season_clean}.csv"
+
+
+def recuperer_ids_matchs_termines(league_id, season, cache=None):
+    """Récupère les IDs des matchs terminés"""
+    season_url = season.replace('/', '%2F')
+    url = f'https://www.fotmob.com/api/data/leagues?id={league_id}&ccode3=FRA&season={season_url}'
+
+    try:
+        data = requete_json(url, ttl=TTL_LISTE_MATCHS, cache=cache)
+        all_matches = data.get('fixtures', {}).get('allMatches', [])
+        ids_termines = [str(m.get('id')) for m in all_matches if m.get('status', {}).get('finished')]
+        return ids_termines
+    except Exception as e:
+        st.error(f"❌ Erreur API: {str(e)}")
+        return []
+
+
+def extraire_tirs_match(match_id, league_name, season, limiter=None, cache=None):
+    """Extrait les tirs d'un match"""
+    url = f'https://www.fotmob.com/api/data/matchDetails?matchId={match_id}'
+    try:
+        data = requete_json(url, limiter=limiter, cache=cache)
+        general = data.get('general', {})
+        home = general.get('homeTeam', {}).get('name', 'Domicile')
+        away = general.get('awayTeam', {}).get('name', 'Extérieur')
+
+        shots = []
+        content = data.get('content', {})
+
+        if content and 'shotmap' in content and content['shotmap']:
+            for shot in content['shotmap'].get('shots', []):
+                shots.append({
+                    'match_id': match_id,
+                    'ligue': league_name,
+                    'saison': season,
+                    'date': general.get('matchTimeUTC'),
+                    'type_evenement': shot.get('eventType'),
+                    'equipe_id': shot.get('teamId'),
+                    'joueur': shot.get('playerName'),
+                    'equipe_joueur': home if shot.get('teamId') == general.get('homeTeam', {}).get('id') else away,
+                    'joueur_id': shot.get('playerId'),
+                    'minute': shot.get('min'),
+                    'xg': shot.get('expectedGoals'),
+                    'situation': shot.get('situation'),
+                    'position_x': shot.get('x'),
+                    'position_y': shot.get('y'),
+                    'cadre': shot.get('isOnTarget'),
+                })
+        return shots
+    except HorsLigneError:
+        # Absent du cache en mode hors-ligne : la collecte doit s'arrêter, pas compter 0 tir
+        raise
+    except Exception:
+        return []
+
+
+def iterer_tirs(ids, league_name, season, on_progress=None,
+                max_workers=NB_WORKERS, rate=REQUETES_PAR_SECONDE, burst=RAFALE_MAX, cache=None):
+    """Télécharge les tirs de plusieurs matchs en parallèle et les produit au fil de l'eau.
+
+    Le parallélisme est borné par `max_workers` et le débit réseau par un
+    token bucket (les réponses servies par le cache ne sont pas limitées).
+    Produit des couples (match_id, tirs) dans l'ordre de `ids` ; seuls les
+    matchs terminés en avance sur l'ordre sont gardés en mémoire.
+    `on_progress(termines, total, nb_tirs)` est appelé depuis le thread
+    appelant (compatible Streamlit). `cache` : voir `requete_json`.
+    """
+    bucket = TokenBucket(rate, burst)
+    en_attente = {}
+    prochain = 0
+    nb_tirs = 0
+
+    def tache(mid):
+        return extraire_tirs_match(mid, league_name, season, limiter=bucket, cache=cache)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(tache, mid): i for i, mid in enumerate(ids)}
+        for termines, future in enumerate(as_completed(futures), 1):
+            i = futures.pop(future)
+            en_attente[i] = future.result()
+            nb_tirs += len(en_attente[i])
+            if on_progress:
+                on_progress(termines, len(ids), nb_tirs)
+            while prochain in en_attente:
+                yield ids[prochain], en_attente.pop(prochain)
+                prochain += 1
+
+
+def lire_ids_existants(filename):
+    """Renvoie les match_id déjà présents dans un CSV de tirs"""
+    if not os.path.exists(filename):
+        return set()
+    with open(filename, newline='', encoding='utf-8') as f:
+        return {row['match_id'] for row in csv.DictReader(f) if row.get('match_id')}
+
+
+def get_partial_filename(filename):
+    """Fichier temporaire dans lequel une collecte écrit avant publication"""
+    return f"{filename}.part"
+
+
+class EcrivainTirs:
+    """Écriture en continu et sûre d'un CSV de tirs.
+
+    Les tirs sont ajoutés match par match à `<fichier>.part`, synchronisé
+    sur disque tous les `flush_every` matchs. `valider()` publie le fichier
+    par renommage atomique : un lecteur ne voit jamais un CSV à moitié écrit.
+    Après un arrêt brutal, le `.part` restant sert de point de reprise.
+    """
+
+    def __init__(self, filename, append=False, flush_every=10):
+        self.filename = filename
+        self.partial = get_partial_filename(filename)
+        self.flush_every = flush_every
+        self.nb_matchs = 0
+        self.nb_tirs = 0
+        self.reprise = os.path.exists(self.partial)
+
+        if self.reprise:
+            self._reparer_partiel()
+        elif append and os.path.exists(filename):
+            shutil.copyfile(filename, self.partial)
+
+        fieldnames = None
+        if os.path.exists(self.partial):
+            with open(self.partial, newline='', encoding='utf-8') as f:
+                fieldnames = next(csv.reader(f), None)
+        self._f = open(self.partial, 'a', newline='', encoding='utf-8')
+        self._writer = None
+        if fieldnames:
+            self._writer = csv.DictWriter(self._f, fieldnames=fieldnames, restval='', extrasaction='ignore')
+
+    def _reparer_partiel(self):
+        """Retire une ligne tronquée et le dernier match, peut-être incomplet"""
+        with open(self.partial, newline='', encoding='utf-8') as f:
+            lignes = f.readlines()
+        if lignes and not lignes[-1].endswith('\n'):
+            lignes.pop()
+        if len(lignes) > 1:
+            dernier = next(csv.reader([lignes[-1]]))[0]
+            while len(lignes) > 1 and next(csv.reader([lignes[-1]]))[0] == dernier:
+                lignes.pop()
+        with open(self.partial, 'w', newline='', encoding='utf-8') as f:
+            f.writelines(lignes)
+
+    def ids_ecrits(self):
+        """match_id déjà présents dans le fichier en cours d'écriture"""
+        self._f.flush()
+        return lire_ids_existants(self.partial)
+
+    def ecrire(self, shots):
+        """Ajoute les tirs d'un match"""
+        if shots:
+            if self._writer is None:
+                self._writer = csv.DictWriter(self._f, fieldnames=shots[0].keys())
+                self._writer.writeheader()
+            self._writer.writerows(shots)
+            self.nb_tirs += len(shots)
+        self.nb_matchs += 1
+        if self.nb_matchs % self.flush_every == 0:
+            self._sync()
+
+    def _sync(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def valider(self):
+        """Publie le fichier ; renvoie False (et nettoie) s'il est vide"""
+        self.fermer()
+        if self._writer is None:
+            os.remove(self.partial)
+            return False
+        os.replace(self.partial, self.filename)
+        return True
+
+    def fermer(self):
+        """Ferme sans publier : le .part reste disponible pour une reprise"""
+        if not self._f.closed:
+            self._sync()
+            self._f.close()
@@ -5,24 +5,26 @@ import matplotlib.pyplot as plt
 from mplsoccer import PyPizza
 import requests
 from io import BytesIO
+from percentiles import CleCohorte, get_percentile_store, rangs_percentiles, version_fichier
+
+# Statistiques du radar par poste
+STATS_PAR_POSTE = {
+    "Attaquant": ['Buts + passes déc. p/90min', 'Distance progressive',
+                  'Passes progressives', 'Réceptions progressives', 'xG p/90 min', 'xAG p/90 min'],
+    "Défenseur": ['Interceptions', 'Tacles gagnants', 'Dégagements',
+                  'Duels défensifs gagnés', 'Passes progressives', 'Duels aériens gagnés'],
+    "Milieu": ['Passes clés', 'Actions créant un tir p/90 min',
+               'xG + xAG p/90 min', 'Passes dans le dernier tiers',
+               'Passes progressives', 'Courses progressives'],
+}
+
+MIN_MATCHS_JOUES = 10
 
-# Fonction pour charger et prétraiter les données
-def load_and_preprocess_data(file_path, position):
+# Fonction pour charger les données d'une ligue (lecture du CSV une seule fois)
+@st.cache_data
+def load_league_data(file_path):
     data = pd.read_csv(file_path)
-    data = data[data['Matchs joués'].astype(int) > 10]
-
-    if position == "Attaquant":
-        stats_cols = ['Buts + passes déc. p/90min', 'Distance progressive',
-                      'Passes progressives', 'Réceptions progressives', 'xG p/90 min', 'xAG p/90 min']
-    elif position == "Défenseur":
-        stats_cols = ['Interceptions', 'Tacles gagnants', 'Dégagements',
-                      'Duels défensifs gagnés', 'Passes progressives', 'Duels aériens gagnés']
-    elif position == "Milieu":
-        stats_cols = ['Passes clés', 'Actions créant un tir p/90 min', 
-                      'xG + xAG p/90 min', 'Passes dans le dernier tiers',
-                      'Passes progressives', 'Courses progressives']
-    else:
-        raise ValueError("Position non reconnue")
+    data = data[data['Matchs joués'].astype(int) > MIN_MATCHS_JOUES]
 
     data = data.rename(columns={
         'Distance progressive parcourue avec le ballon': 'Distance progressive',
@@ -34,15 +36,23 @@ def load_and_preprocess_data(file_path, position):
         'Actions menant à un tir par 90 minutes':'Actions créant un tir p/90 min',
         'Somme des buts et passes attendues par 90 minutes':'xG + xAG p/90 min'
     })
+    return data
 
-    stats_cols = [col for col in stats_cols if col in data.columns]
+# Fonction pour charger et prétraiter les données (centiles servis par le store partagé)
+def load_and_preprocess_data(league, position):
+    if position not in STATS_PAR_POSTE:
+        raise ValueError("Position non reconnue")
 
-    for col in stats_cols:
-        data[col] = data[col].astype(float) / data['Matchs en 90 min']
+    file_path = league_files[league][position]
+    data = load_league_data(file_path)
+    stats_cols = [col for col in STATS_PAR_POSTE[position] if col in data.columns]
 
-    for col in stats_cols:
-        data[col] = (data[col].rank(pct=True) * 100).astype(int)
+    cle = CleCohorte(version_fichier(file_path), league, position,
+                     f"Matchs joués > {MIN_MATCHS_JOUES}", tuple(stats_cols), "rank_pct")
+    percentiles = get_percentile_store().get(cle, lambda: rangs_percentiles(data, stats_cols))
 
+    data = data.copy()
+    data[stats_cols] = percentiles
     return data, stats_cols
 
 # Fonction pour charger un logo à partir d'une URL
@@ -95,8 +105,8 @@ selected_position = st.sidebar.selectbox("Choisissez la position", options=["Att
 league1 = st.sidebar.selectbox("Ligue du premier joueur", options=list(league_files.keys()))
 league2 = st.sidebar.selectbox("Ligue du deuxième joueur", options=list(league_files.keys()))
 
-data1, params1 = load_and_preprocess_data(league_files[league1][selected_position], selected_position)
-data2, params2 = load_and_preprocess_data(league_files[league2][selected_position], selected_position)
+data1, params1 = load_and_preprocess_data(league1, selected_position)
+data2, params2 = load_and_preprocess_data(league2, selected_position)
 
 player1 = st.sidebar.selectbox("Premier joueur", options=data1['Joueur'].unique())
 player2 = st.sidebar.selectbox("Deuxième joueur", options=data2['Joueur'].unique())
@@ -0,0 +1,41 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from empreintes import empreinte_fichier
+
+DATA_FILE = "df_BIG2025.csv"
+
+# Colonnes d'identification stockées en catégories
+COLONNES_IDENTIFIANTS = ['Joueur', 'Équipe', 'Compétition', 'Nationalité', 'Position']
+
+
+def typer_joueurs(df):
+    """Types compacts : catégories pour les identifiants, float32, int16 (int32 si besoin)"""
+    for col in COLONNES_IDENTIFIANTS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in df.select_dtypes(include=['float']).columns:
+        df[col] = df[col].astype(np.float32)
+    for col in df.select_dtypes(include=['integer']).columns:
+        info = np.iinfo(np.int16)
+        dtype = np.int16 if df[col].min() >= info.min and df[col].max() <= info.max else np.int32
+        df[col] = df[col].astype(dtype)
+    return df
+
+
+@lru_cache(maxsize=4)
+def _charger(path, empreinte):
+    return typer_joueurs(pd.read_csv(path))
+
+
+def charger_joueurs(path=DATA_FILE):
+    """Statistiques joueurs typées, lues une seule fois par processus.
+
+    Le cache est indexé par l'empreinte SHA-256 du fichier (recalculée
+    seulement si sa date de modification change) : un fichier mis à jour
+    est relu au prochain appel. Le DataFrame est partagé entre les
+    sessions et ne doit pas être modifié en place.
+    """
+    return _charger(path, empreinte_fichier(path))
@@ -0,0 +1,206 @@
+"""Générateur de joueurs U21 synthétiques pour le scouting report.
+
+Les joueurs sont produits par blocs vectorisés, de façon déterministe pour
+une graine et une taille de bloc données ; ils peuvent être écrits sur
+disque (Parquet ou CSV) sans jamais tenir en mémoire en entier.
+
+Exemple :
+    python donnees_scouting.py --joueurs 1000000 --sortie joueurs_scouting.parquet
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+TAILLE_BLOC = 250_000
+
+# Catégories de joueurs basées sur le rapport CIES
+CATEGORIES = [
+    'Short-passes Goalkeepers', 'Long-passes Goalkeepers',
+    'Full Defence Centre Backs', 'Allrounder Centre Backs', 'Build-up Centre Backs',
+    'Defensive Left Full/Wing Backs', 'Attacking Left Full/Wing Backs',
+    'Defensive Right Full/Wing Backs', 'Attacking Right Full/Wing Backs',
+    'Holding Midfielders', 'Playmaking Midfielders', 'Assisting Midfielders',
+    'Infiltrating Midfielders', 'Shooting Midfielders',
+    'Infiltrating Left Wingers', 'Assisting/Shooting Left Wingers',
+    'Infiltrating Right Wingers', 'Assisting/Shooting Right Wingers',
+    'Allrounder Centre Forwards', 'Target Man Centre Forwards'
+]
+
+# Noms de joueurs réels du rapport
+TOP_PLAYERS = [
+    'Lamine Yamal', 'Warren Zaïre-Emery', 'João Neves', 'Pau Cubarsí',
+    'Kendry Páez', 'Alejandro Garnacho', 'Kenan Yildiz', 'Rico Lewis',
+    'Jorrel Hato', 'Sávio Moreira', 'Kobbie Mainoo', 'Endrick Felipe',
+    'Malick Diouf', 'Martim Fernandes', 'Geovany Quenda', 'Claudio Echeverri',
+    'Carlos Baleba', 'Aleksandar Pavlović', 'Mario Stroeykens', 'Samu Aghehowa'
+]
+
+# Championnats (poids relatif du nombre de joueurs) et clubs connus de chacun
+LEAGUES = {
+    'La Liga': (0.15, ['FC Barcelona', 'Real Madrid']),
+    'Premier League': (0.17, ['Manchester United', 'Manchester City', 'Brighton & Hove', 'Chelsea', 'Arsenal']),
+    'Ligue 1': (0.14, ['Paris St-Germain']),
+    'Serie A': (0.13, ['Juventus']),
+    'Bundesliga': (0.13, ['Bayern München']),
+    'Eredivisie': (0.10, ['Ajax']),
+    'Primeira Liga': (0.10, ['Porto', 'Sporting CP']),
+    'Pro League': (0.08, []),
+}
+CLUBS_PAR_LIGUE = 18
+
+COUNTRIES = [
+    'Spain', 'France', 'England', 'Germany', 'Brazil', 'Argentina',
+    'Portugal', 'Netherlands', 'Italy', 'Belgium', 'Turkey', 'Ecuador'
+]
+POIDS_PAYS = [0.12, 0.13, 0.12, 0.10, 0.10, 0.07, 0.09, 0.08, 0.07, 0.06, 0.03, 0.03]
+
+# Profil moyen (ground_defence, aerial_play, distribution, chance_creation, take_on, finishing)
+PROFILS = {
+    'Goalkeepers': (25, 60, 60, 8, 5, 2),
+    'Centre Backs': (75, 72, 55, 20, 20, 15),
+    'Full/Wing Backs': (62, 45, 55, 50, 50, 20),
+    'Midfielders': (50, 40, 65, 55, 45, 40),
+    'Wingers': (25, 30, 45, 65, 75, 60),
+    'Centre Forwards': (20, 55, 35, 45, 50, 75),
+}
+ATTRIBUTS = ['ground_defence', 'aerial_play', 'distribution', 'chance_creation', 'take_on', 'finishing']
+
+
+def _clubs():
+    """Clubs de chaque championnat : clubs connus complétés jusqu'à CLUBS_PAR_LIGUE"""
+    clubs, ligue_du_club = [], []
+    for ligue, (_, connus) in LEAGUES.items():
+        noms = connus + [f"{ligue} Club {i}" for i in range(1, CLUBS_PAR_LIGUE - len(connus) + 1)]
+        clubs += noms
+        ligue_du_club += [ligue] * len(noms)
+    return clubs, np.array([list(LEAGUES).index(l) for l in ligue_du_club])
+
+
+def _profils_categories():
+    """Matrice (catégories × attributs) des moyennes de profil"""
+    return np.array([
+        next(profil for poste, profil in PROFILS.items() if c.endswith(poste))
+        for c in CATEGORIES
+    ], dtype=np.float64)
+
+
+def generer_bloc(debut, n, rng):
+    """Joueurs debut..debut+n-1 (DataFrame), tirés avec le générateur `rng`"""
+    clubs, ligue_du_club = _clubs()
+    ligues = list(LEAGUES)
+    poids_ligues = np.array([p for p, _ in LEAGUES.values()])
+    poids_ligues /= poids_ligues.sum()
+
+    # Championnat puis club (uniforme parmi les clubs du championnat)
+    ligue = rng.choice(len(ligues), size=n, p=poids_ligues)
+    premier_club = np.searchsorted(ligue_du_club, np.arange(len(ligues)))
+    club = premier_club[ligue] + rng.integers(0, CLUBS_PAR_LIGUE, size=n)
+
+    categorie = rng.integers(0, len(CATEGORIES), size=n)
+    age = rng.uniform(17, 21, n)
+    performance = np.clip(rng.normal(70, 8, n), 50, 95)
+
+    # Attributs autour du profil du poste, tirés vers le haut par la performance
+    attributs = _profils_categories()[categorie] + (performance - 70)[:, None] * 0.8
+    attributs = np.clip(attributs + rng.normal(0, 12, (n, len(ATTRIBUTS))), 0, 100)
+
+    minutes = np.clip(rng.normal(1700, 600, n), 500, 3000).astype(np.int32)
+    matchs_90 = minutes / 90
+    goals = rng.poisson(attributs[:, 5] / 100 * matchs_90 * 0.35).astype(np.int32)
+    assists = rng.poisson(attributs[:, 3] / 100 * matchs_90 * 0.25).astype(np.int32)
+
+    # Valeur marchande log-normale : performance, jeunesse et championnat
+    bonus_ligue = np.where(ligue < 5, 0.4, 0.0)
+    valeur = np.exp(2.3 + 0.08 * (performance - 70) - 0.15 * (age - 19) + bonus_ligue + rng.normal(0, 0.4, n))
+    valeur_min = valeur * rng.uniform(0.6, 0.9, n)
+    valeur_max = valeur * rng.uniform(1.1, 1.5, n)
+
+    ids = np.arange(debut, debut + n)
+    noms = np.array([f'Player_{i}' for i in ids], dtype=object)
+    connus = ids < len(TOP_PLAYERS)
+    noms[connus] = np.array(TOP_PLAYERS, dtype=object)[ids[connus]]
+
+    df = pd.DataFrame({
+        'name': noms,
+        'age': age,
+        'category': pd.Categorical.from_codes(categorie, CATEGORIES),
+        'club': pd.Categorical.from_codes(club, clubs),
+        'league': pd.Categorical.from_codes(ligue, ligues),
+        'country': pd.Categorical.from_codes(rng.choice(len(COUNTRIES), size=n, p=POIDS_PAYS), COUNTRIES),
+        'performance_index': performance,
+        'transfer_value_min': valeur_min,
+        'transfer_value_max': valeur_max,
+        **{nom: attributs[:, j] for j, nom in enumerate(ATTRIBUTS)},
+        'minutes_played': minutes,
+        'goals': goals,
+        'assists': assists,
+        'yellow_cards': rng.poisson(matchs_90 * 0.12 * (0.5 + attributs[:, 0] / 100)).astype(np.int32),
+        'red_cards': rng.poisson(matchs_90 * 0.004, n).astype(np.int32),
+    }, index=ids)
+    df['transfer_value_avg'] = (df['transfer_value_min'] + df['transfer_value_max']) / 2
+    return df
+
+
+def iterer_blocs(n_players, seed=42, taille_bloc=TAILLE_BLOC):
+    """Blocs successifs de joueurs ; un générateur indépendant par bloc"""
+    n_blocs = -(-n_players // taille_bloc)
+    graines = np.random.SeedSequence(seed).spawn(n_blocs)
+    for b, graine in enumerate(graines):
+        debut = b * taille_bloc
+        yield generer_bloc(debut, min(taille_bloc, n_players - debut), np.random.default_rng(graine))
+
+
+def generer_joueurs(n_players, seed=42, taille_bloc=TAILLE_BLOC):
+    """DataFrame de `n_players` joueurs, identique pour une même graine"""
+    return pd.concat(iterer_blocs(n_players, seed, taille_bloc))
+
+
+def ecrire_joueurs(chemin, n_players, seed=42, taille_bloc=TAILLE_BLOC):
+    """Écrit les joueurs bloc par bloc (.parquet ou .csv) sans tout garder en mémoire"""
+    tmp = f"{chemin}.tmp"
+    writer = None
+    try:
+        for i, bloc in enumerate(iterer_blocs(n_players, seed, taille_bloc)):
+            if chemin.endswith('.csv'):
+                bloc.to_csv(tmp, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(bloc, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, chemin)
+
+
+def charger_joueurs_scouting(chemin):
+    """Relit un fichier écrit par ecrire_joueurs"""
+    if chemin.endswith('.csv'):
+        df = pd.read_csv(chemin)
+        for col in ('category', 'club', 'league', 'country'):
+            df[col] = df[col].astype('category')
+        return df
+    return pd.read_parquet(chemin)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère des joueurs synthétiques pour le scouting report")
+    parser.add_argument('--joueurs', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--taille-bloc', type=int, default=TAILLE_BLOC)
+    parser.add_argument('--sortie', default='joueurs_scouting.parquet', help="Fichier .parquet ou .csv")
+    args = parser.parse_args()
+
+    debut = time.time()
+    ecrire_joueurs(args.sortie, args.joueurs, args.seed, args.taille_bloc)
+    print(f"🎉 {args.joueurs} joueurs générés en {time.time() - debut:.1f}s -> {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
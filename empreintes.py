@@ -0,0 +1,18 @@
+import hashlib
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=64)
+def _hash_fichier(path, mtime_ns, taille):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloc in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def empreinte_fichier(path):
+    """SHA-256 du contenu d'un fichier, recalculé seulement s'il a changé"""
+    stat = os.stat(path)
+    return _hash_fichier(path, stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,141 @@
+"""Export en lot des shotmaps (PNG/SVG) de tous les tireurs réguliers.
+
+Exemple :
+    python export_shotmaps.py --saison 2024/2025 --min-tirs 20 --format png --workers 8
+"""
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from collecte_fotmob import get_filename
+from index_tirs import ShotIndex
+from rendu_shotmap import LEAGUE_THEMES, COLONNES_SHOTMAP, create_shotmap, prefetch_assets
+from stockage_tirs import charger_tirs
+
+# Index chargés une seule fois par processus de rendu
+_index_par_fichier = {}
+
+
+def charger_index(csv_path):
+    """ShotIndex d'un fichier de tirs (hors penalties), mis en cache par processus"""
+    if csv_path not in _index_par_fichier:
+        data = charger_tirs(csv_path, COLONNES_SHOTMAP)
+        data = data[data['situation'] != 'Penalty'].reset_index(drop=True)
+        _index_par_fichier[csv_path] = ShotIndex(data)
+    return _index_par_fichier[csv_path]
+
+
+def nom_fichier(player_id, player_name, fmt):
+    """Nom de fichier ASCII stable pour un joueur"""
+    ascii_name = unicodedata.normalize('NFKD', player_name).encode('ascii', 'ignore').decode()
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', ascii_name).strip('_').lower()
+    return f"{player_id}_{slug}.{fmt}"
+
+
+def lister_taches(league_keys, season, min_tirs, sortie, fmt, size):
+    """Une tâche par joueur ayant au moins `min_tirs` tirs (hors penalties)"""
+    taches = []
+    for key in league_keys:
+        theme = LEAGUE_THEMES[key]
+        csv_path = get_filename(theme['slug'], season)
+        if not os.path.exists(csv_path):
+            print(f"⚠️ {csv_path} introuvable, compétition ignorée")
+            continue
+
+        index = charger_index(csv_path)
+        joueurs = index.stats[index.stats['tirs'] >= min_tirs]
+        # Images téléchargées une fois dans le cache disque, relu par les processus de rendu
+        prefetch_assets(index, joueurs.index.tolist())
+        for player_id, stats in joueurs.iterrows():
+            shots = index.shots(player_id)
+            # Équipe principale du joueur : celle avec laquelle il a le plus tiré
+            team = shots['equipe_joueur'].value_counts().index[0]
+            player_info = {
+                'joueur': str(shots['joueur'].iloc[0]),
+                'equipe_joueur': str(team),
+                'saison': str(shots['saison'].iloc[0]),
+            }
+            fichier = os.path.join(sortie, theme['slug'], nom_fichier(player_id, player_info['joueur'], fmt))
+            taches.append({
+                'csv_path': csv_path,
+                'ligue': key,
+                'joueur_id': int(player_id),
+                'player_info': player_info,
+                'tirs': int(stats['tirs']),
+                'buts': int(stats['buts']),
+                'xg': round(float(stats['xg']), 3),
+                'fichier': fichier,
+                'format': fmt,
+                'size': size,
+            })
+    return taches
+
+
+def rendre(tache):
+    """Rend une shotmap dans un processus de travail"""
+    index = charger_index(tache['csv_path'])
+    theme = LEAGUE_THEMES[tache['ligue']]
+    os.makedirs(os.path.dirname(tache['fichier']), exist_ok=True)
+    fig = create_shotmap(index, tache['joueur_id'], theme, tache['player_info'], size=tache['size'])
+    try:
+        fig.savefig(tache['fichier'], format=tache['format'], facecolor=fig.get_facecolor())
+    finally:
+        plt.close(fig)
+    return tache['fichier']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export en lot des shotmaps")
+    parser.add_argument('--ligues', nargs='+', default=list(LEAGUE_THEMES.keys()),
+                        choices=list(LEAGUE_THEMES.keys()), help="Compétitions à exporter")
+    parser.add_argument('--saison', default='2024/2025')
+    parser.add_argument('--min-tirs', type=int, default=20, help="Nombre minimum de tirs (hors penalties)")
+    parser.add_argument('--format', choices=['png', 'svg'], default='png')
+    parser.add_argument('--taille', choices=['normal', 'large'], default='normal')
+    parser.add_argument('--sortie', default='exports_shotmaps')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    taches = lister_taches(args.ligues, args.saison, args.min_tirs, args.sortie, args.format, args.taille)
+    print(f"🎨 {len(taches)} shotmaps à générer sur {args.workers} processus")
+
+    debut = time.time()
+    manifest = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(rendre, tache): tache for tache in taches}
+        for i, future in enumerate(as_completed(futures), 1):
+            tache = futures[future]
+            entree = {k: tache[k] for k in ('ligue', 'joueur_id', 'tirs', 'buts', 'xg', 'fichier')}
+            entree.update(tache['player_info'])
+            try:
+                future.result()
+                entree['statut'] = 'ok'
+            except Exception as e:
+                entree['statut'] = f"erreur: {e}"
+            manifest.append(entree)
+            if i % 50 == 0 or i == len(taches):
+                print(f"⏳ {i}/{len(taches)} ({time.time() - debut:.0f}s)")
+
+    manifest.sort(key=lambda e: (e['ligue'], -e['tirs']))
+    os.makedirs(args.sortie, exist_ok=True)
+    manifest_path = os.path.join(args.sortie, 'manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'saison': args.saison,
+            'min_tirs': args.min_tirs,
+            'format': args.format,
+            'shotmaps': manifest,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"🎉 {len(manifest)} shotmaps exportées en {time.time() - debut:.0f}s -> {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
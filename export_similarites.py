@@ -0,0 +1,129 @@
+"""Export en lot des joueurs similaires (top-k de chaque joueur dans chaque compétition).
+
+Même sélection de features, même normalisation et mêmes candidats que
+joueurssimilaires.py : l'application ne cherche les voisins que dans la
+compétition choisie, l'export donne donc pour chaque joueur le top-k
+(hors joueur lui-même) de chaque compétition. Les similarités sont
+calculées par blocs de lignes (mémoire bornée à taille_bloc × N) répartis
+sur plusieurs processus.
+
+Exemple :
+    python export_similarites.py --k 20 --sortie similarites.parquet --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from donnees_joueurs import charger_joueurs
+from similarite import SELECTED_FEATURES, MoteurSimilarite, preparer_features, selection_top_k
+
+TAILLE_BLOC = 1024
+
+# Matrice normalisée et lignes de chaque compétition, transmises une fois à chaque processus
+_X = None
+_CANDIDATS = None
+
+
+def _initialiser(X, candidats):
+    global _X, _CANDIDATS
+    _X = X
+    _CANDIDATS = candidats
+
+
+def voisins_bloc(debut, fin, k):
+    """Top-k (hors soi-même) des lignes debut..fin parmi les joueurs de chaque compétition.
+
+    Même sélection (et même ordre des ex æquo) que MoteurSimilarite.top_k.
+    Les places vides (compétition de moins de k autres joueurs) ont
+    l'indice -1 et un score -inf.
+    """
+    scores = _X[debut:fin] @ _X.T
+    lignes = np.arange(fin - debut)
+    scores[lignes, lignes + debut] = -np.inf
+    indices = np.full((fin - debut, len(_CANDIDATS), k), -1, dtype=np.int32)
+    scores_k = np.full(indices.shape, -np.inf, dtype=np.float32)
+    for c, candidats in enumerate(_CANDIDATS):
+        kc = min(k, len(candidats))
+        sous = scores[:, candidats]
+        meilleurs = selection_top_k(sous, kc)
+        indices[:, c, :kc] = candidats[meilleurs]
+        scores_k[:, c, :kc] = np.take_along_axis(sous, meilleurs, axis=1)
+    indices[np.isneginf(scores_k)] = -1
+    return debut, indices, scores_k
+
+
+def calculer_voisins(X, candidats, k, taille_bloc=TAILLE_BLOC, workers=None):
+    """Tableaux (N × compétitions × k) des indices et scores des voisins de chaque joueur
+
+    `candidats` : liste des indices de lignes de chaque compétition (le
+    masque de candidats de l'application).
+    """
+    n = X.shape[0]
+    indices = np.empty((n, len(candidats), k), dtype=np.int32)
+    scores = np.empty((n, len(candidats), k), dtype=np.float32)
+    blocs = [(debut, min(debut + taille_bloc, n)) for debut in range(0, n, taille_bloc)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialiser, initargs=(X, candidats)) as executor:
+        futures = [executor.submit(voisins_bloc, debut, fin, k) for debut, fin in blocs]
+        for future in futures:
+            debut, idx, sc = future.result()
+            indices[debut:debut + len(idx)] = idx
+            scores[debut:debut + len(idx)] = sc
+    return indices, scores
+
+
+def table_voisins(df, indices, scores):
+    """Table longue (joueur, voisin, rang, score), une ligne par paire.
+
+    Le rang est compté dans la compétition du voisin (voisin_competition),
+    comme la liste affichée par l'application pour cette compétition.
+    """
+    n, nb_competitions, k = indices.shape
+    source = np.repeat(np.arange(n), nb_competitions * k)
+    rang = np.tile(np.arange(1, k + 1, dtype=np.int16), n * nb_competitions)
+    voisin = indices.ravel()
+    garder = voisin >= 0
+    source, rang, voisin = source[garder], rang[garder], voisin[garder]
+    return pd.DataFrame({
+        'joueur': pd.Categorical(df['Joueur'].to_numpy()[source]),
+        'equipe': pd.Categorical(df['Équipe'].to_numpy()[source]),
+        'voisin': pd.Categorical(df['Joueur'].to_numpy()[voisin]),
+        'voisin_equipe': pd.Categorical(df['Équipe'].to_numpy()[voisin]),
+        'voisin_competition': pd.Categorical(df['Compétition'].to_numpy()[voisin]),
+        'rang': rang,
+        'score': scores.ravel()[garder],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export des joueurs similaires de chaque joueur")
+    parser.add_argument('--fichier', default='df_BIG2025.csv')
+    parser.add_argument('--k', type=int, default=20, help="Nombre de voisins par joueur et par compétition")
+    parser.add_argument('--sortie', default='similarites.parquet', help="Fichier .parquet ou .csv")
+    parser.add_argument('--taille-bloc', type=int, default=TAILLE_BLOC)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    debut = time.time()
+    df = charger_joueurs(args.fichier)
+    features = [feature for feature in SELECTED_FEATURES if feature in df.columns]
+    X = MoteurSimilarite(preparer_features(df, features)).X
+    # Candidats de l'application : les joueurs de la compétition choisie
+    candidats = list(df.groupby('Compétition', observed=True).indices.values())
+    print(f"🔎 {len(df)} joueurs, {len(candidats)} compétitions, {len(features)} features, {args.workers} processus")
+
+    indices, scores = calculer_voisins(X, candidats, args.k, args.taille_bloc, args.workers)
+    table = table_voisins(df, indices, scores)
+
+    if args.sortie.endswith('.csv'):
+        table.to_csv(args.sortie, index=False)
+    else:
+        table.to_parquet(args.sortie, index=False)
+    print(f"🎉 {len(table)} paires exportées en {time.time() - debut:.0f}s -> {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Index approximatif (IVF) pour la recherche de joueurs similaires.
+
+Les vecteurs normalisés L2 sont répartis entre `nlist` centroïdes appris par
+k-means sphérique (numpy uniquement). Une requête ne compare que les joueurs
+des `nprobe` listes les plus proches : `nprobe` règle le compromis
+rappel / latence. L'index ne stocke que les centroïdes et l'affectation de
+chaque joueur ; la matrice des vecteurs reste celle du MoteurSimilarite.
+
+Banc d'essai (rappel par rapport à la recherche exacte) :
+    python index_ann.py --taille 50000 --k 10
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+NPROBE_DEFAUT = 16
+# Taille du pool à partir de laquelle l'application passe par l'index IVF
+SEUIL_ANN = int(os.environ.get('SIMILARITE_SEUIL_ANN', 20000))
+
+
+class IndexIVF:
+    """Listes inversées sur vecteurs normalisés L2 (similarité cosinus)"""
+
+    def __init__(self, centroides, nprobe=NPROBE_DEFAUT):
+        self.centroides = np.asarray(centroides, dtype=np.float32)
+        self.nprobe = nprobe
+        self.affectation = np.empty(0, dtype=np.int32)
+        self._trier()
+
+    @classmethod
+    def construire(cls, X, nlist=None, nprobe=NPROBE_DEFAUT, n_iter=10, seed=42):
+        """Apprend les centroïdes par k-means sphérique puis indexe X"""
+        n = X.shape[0]
+        nlist = nlist or max(1, int(4 * np.sqrt(n)))
+        nlist = min(nlist, n)
+        rng = np.random.default_rng(seed)
+        echantillon = X[rng.choice(n, size=min(n, nlist * 64), replace=False)]
+        centroides = echantillon[rng.choice(len(echantillon), size=nlist, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = np.argmax(echantillon @ centroides.T, axis=1)
+            sommes = np.zeros_like(centroides)
+            np.add.at(sommes, labels, echantillon)
+            normes = np.linalg.norm(sommes, axis=1, keepdims=True)
+            vides = normes[:, 0] == 0
+            # Un centroïde vide est réinitialisé sur un point au hasard
+            sommes[vides] = echantillon[rng.choice(len(echantillon), size=vides.sum())]
+            normes[vides] = np.linalg.norm(sommes[vides], axis=1, keepdims=True)
+            normes[normes == 0] = 1
+            centroides = sommes / normes
+
+        index = cls(centroides, nprobe=nprobe)
+        index.ajouter(X)
+        return index
+
+    def _trier(self):
+        """Regroupe les joueurs par liste : ordre trié + offsets de chaque liste"""
+        self.ordre = np.argsort(self.affectation, kind='stable')
+        comptes = np.bincount(self.affectation, minlength=len(self.centroides))
+        self.fins = np.cumsum(comptes)
+        self.debuts = self.fins - comptes
+
+    def _affecter(self, X, taille_bloc=65536):
+        return np.concatenate([
+            np.argmax(X[i:i + taille_bloc] @ self.centroides.T, axis=1)
+            for i in range(0, X.shape[0], taille_bloc)
+        ] or [np.empty(0, dtype=np.int64)]).astype(np.int32)
+
+    def __len__(self):
+        return len(self.affectation)
+
+    def ajouter(self, X_nouveaux):
+        """Ajoute des joueurs (nouvelle saison) sans réapprendre les centroïdes"""
+        self.affectation = np.concatenate([self.affectation, self._affecter(X_nouveaux)])
+        self._trier()
+
+    def rechercher(self, X, q, k, nprobe=None, candidats=None):
+        """Top-k approximatif de `q` parmi les lignes de X.
+
+        `candidats` est un masque booléen optionnel sur les lignes de X. Si
+        les listes sondées ne contiennent pas assez de candidats, `nprobe`
+        est doublé jusqu'à en trouver `k` (ou sonder toutes les listes).
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.centroides))
+        proximites = self.centroides @ q
+        while True:
+            listes = np.argpartition(-proximites, nprobe - 1)[:nprobe]
+            indices = np.concatenate([self.ordre[self.debuts[l]:self.fins[l]] for l in listes])
+            if candidats is not None:
+                indices = indices[candidats[indices]]
+            if len(indices) >= k or nprobe == len(self.centroides):
+                break
+            nprobe = min(2 * nprobe, len(self.centroides))
+
+        k = min(k, len(indices))
+        if k == 0:
+            return indices[:0], np.empty(0, dtype=np.float32)
+        scores = X[indices] @ q
+        meilleurs = np.argpartition(-scores, k - 1)[:k]
+        meilleurs = meilleurs[np.argsort(-scores[meilleurs], kind='stable')]
+        return indices[meilleurs], scores[meilleurs]
+
+    def sauvegarder(self, chemin, sources, features=(), echelle=None):
+        """Écrit l'index, les fichiers (saisons) déjà indexés et l'échelle des features"""
+        echelle = echelle or {}
+        tmp = f"{chemin}.tmp.npz"
+        np.savez(tmp, centroides=self.centroides, affectation=self.affectation,
+                 nprobe=self.nprobe, sources=json.dumps(sources), features=json.dumps(list(features)),
+                 **{f"echelle_{cle}": valeurs for cle, valeurs in echelle.items()})
+        os.replace(tmp, chemin)
+
+    @classmethod
+    def charger(cls, chemin):
+        """Renvoie (index, sources, features, echelle) depuis un fichier .npz"""
+        with np.load(chemin) as f:
+            index = cls(f['centroides'], nprobe=int(f['nprobe']))
+            index.affectation = f['affectation']
+            sources = json.loads(str(f['sources']))
+            features = json.loads(str(f['features']))
+            echelle = {cle[len('echelle_'):]: f[cle] for cle in f.files if cle.startswith('echelle_')}
+        index._trier()
+        return index, sources, features, echelle
+
+
+def charger_ou_construire(chemin, df, features, sources, nprobe=NPROBE_DEFAUT):
+    """Index IVF et matrice des features de `df`, réutilisés depuis le disque si possible.
+
+    `sources` décrit les fichiers dont proviennent les lignes de `df`, dans
+    l'ordre : [[fichier, version, nb_lignes], ...]. L'échelle des features
+    (moyennes et MinMax de preparer_features) est persistée avec l'index :
+    quand une saison est ajoutée à la fin des sources, les lignes déjà
+    indexées gardent exactement leur vecteur et seules les nouvelles sont
+    affectées aux listes. Sinon (sources ou features différentes), l'échelle
+    et l'index sont recalculés. Renvoie (index, X) ; X est à donner au
+    MoteurSimilarite auquel l'index est attaché.
+    """
+    from similarite import ajuster_echelle, normaliser_l2, preparer_features
+
+    features = list(features)
+    if os.path.exists(chemin):
+        try:
+            index, sources_indexees, features_indexees, echelle = IndexIVF.charger(chemin)
+        except (OSError, ValueError, KeyError):
+            index = None
+        if (index is not None and features_indexees == features and echelle
+                and sources[:len(sources_indexees)] == sources_indexees):
+            X = preparer_features(df, features, echelle)
+            if len(sources_indexees) < len(sources):
+                index.ajouter(normaliser_l2(X[len(index):]))
+                index.sauvegarder(chemin, sources, features, echelle)
+            index.nprobe = nprobe
+            return index, X
+
+    echelle = ajuster_echelle(df, features)
+    X = preparer_features(df, features, echelle)
+    index = IndexIVF.construire(normaliser_l2(X), nprobe=nprobe)
+    index.sauvegarder(chemin, sources, features, echelle)
+    return index, X
+
+
+def main():
+    import pandas as pd
+    from similarite import SELECTED_FEATURES, MoteurSimilarite, preparer_features
+
+    parser = argparse.ArgumentParser(description="Rappel et latence de l'index IVF face à la recherche exacte")
+    parser.add_argument('--fichier', default='df_BIG2025.csv')
+    parser.add_argument('--taille', type=int, default=50000,
+                        help="Taille du pool simulé (joueurs réels bruités)")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--requetes', type=int, default=200)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.fichier)
+    features = [f for f in SELECTED_FEATURES if f in df.columns]
+    X = preparer_features(df, features)
+    rng = np.random.default_rng(0)
+    if args.taille > len(X):
+        tirages = rng.integers(0, len(X), args.taille - len(X))
+        bruit = rng.normal(0, 0.05, (len(tirages), X.shape[1]))
+        X = np.vstack([X, np.clip(X[tirages] + bruit, 0, 1)])
+    moteur = MoteurSimilarite(X)
+
+    debut = time.perf_counter()
+    index = IndexIVF.construire(moteur.X)
+    print(f"{len(moteur)} joueurs, {len(index.centroides)} listes, construction {time.perf_counter() - debut:.2f}s")
+
+    requetes = rng.choice(len(moteur), size=args.requetes, replace=False)
+    debut = time.perf_counter()
+    exacts = [set(moteur.top_k(i, args.k)[0].tolist()) for i in requetes]
+    latence_exacte = (time.perf_counter() - debut) / args.requetes * 1000
+    print(f"exact      : {latence_exacte:.2f} ms/requête")
+
+    for nprobe in (1, 2, 4, 8, 16, 32, 64):
+        debut = time.perf_counter()
+        trouves = [index.rechercher(moteur.X, moteur.X[i], args.k, nprobe=nprobe)[0] for i in requetes]
+        latence = (time.perf_counter() - debut) / args.requetes * 1000
+        rappel = np.mean([len(exact & set(t.tolist())) / args.k for exact, t in zip(exacts, trouves)])
+        print(f"nprobe={nprobe:<3}: rappel@{args.k} {rappel:.3f}  {latence:.2f} ms/requête")
+
+
+if __name__ == "__main__":
+    main()
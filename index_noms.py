@@ -0,0 +1,92 @@
+"""Recherche approximative de noms de joueurs, insensible aux accents et à la casse.
+
+Les noms sont normalisés (NFKD sans diacritiques, casefold) puis découpés en
+trigrammes ; un index inversé trigramme -> joueurs permet de classer les
+candidats en ne visitant que les noms qui partagent au moins un trigramme
+avec la requête.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+SEUIL_NOMS = 0.3
+
+# Lettres sans décomposition NFKD (Ødegaard, Łukasz, ...)
+TRANSLITTERATION = str.maketrans({
+    'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ß': 'ss', 'đ': 'd', 'ð': 'd',
+    'ł': 'l', 'ı': 'i', 'þ': 'th',
+})
+
+
+def normaliser_nom(nom):
+    """'Kylian Mbappé' -> 'kylian mbappe'"""
+    decompose = unicodedata.normalize('NFKD', str(nom))
+    sans_accents = ''.join(c for c in decompose if not unicodedata.combining(c))
+    ascii_nom = sans_accents.casefold().translate(TRANSLITTERATION)
+    return re.sub(r'[^0-9a-z]+', ' ', ascii_nom).strip()
+
+
+def trigrammes(nom_normalise):
+    """Trigrammes de chaque mot, complétés par des espaces (comme pg_trgm)"""
+    grams = set()
+    for mot in nom_normalise.split():
+        mot = f"  {mot} "
+        grams.update(mot[i:i + 3] for i in range(len(mot) - 2))
+    return grams
+
+
+class IndexNoms:
+    """Index trigramme d'une liste de noms.
+
+    Le score d'un candidat est la moyenne de la part des trigrammes de la
+    requête qu'il contient (une requête partielle comme « mbappe » retrouve
+    « Kylian Mbappé ») et de l'indice de Jaccard (qui départage en faveur
+    du nom le plus proche en longueur).
+    """
+
+    def __init__(self, noms):
+        self.noms = list(noms)
+        postings = defaultdict(list)
+        self._tailles = np.zeros(len(self.noms), dtype=np.float32)
+        self._normalises = []
+        for i, nom in enumerate(self.noms):
+            normalise = normaliser_nom(nom)
+            grams = trigrammes(normalise)
+            self._normalises.append(normalise)
+            self._tailles[i] = len(grams)
+            for gram in grams:
+                postings[gram].append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.noms)
+
+    def rechercher(self, requete, limite=5, seuil=SEUIL_NOMS):
+        """Liste de (indice, nom, score) triée par score décroissant"""
+        grams = trigrammes(normaliser_nom(requete))
+        if not grams:
+            return []
+        communs = np.zeros(len(self.noms), dtype=np.float32)
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is not None:
+                communs[ids] += 1
+
+        candidats = np.flatnonzero(communs)
+        if len(candidats) == 0:
+            return []
+        c = communs[candidats]
+        jaccard = c / (len(grams) + self._tailles[candidats] - c)
+        scores = (c / len(grams) + jaccard) / 2
+
+        garder = scores >= seuil
+        candidats, scores = candidats[garder], scores[garder]
+        ordre = np.argsort(-scores, kind='stable')[:limite]
+        return [(int(candidats[j]), self.noms[candidats[j]], float(scores[j])) for j in ordre]
+
+    def meilleur(self, requete, seuil=SEUIL_NOMS):
+        """Indice du nom le plus proche de `requete`, ou None"""
+        resultats = self.rechercher(requete, limite=1, seuil=seuil)
+        return resultats[0][0] if resultats else None
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# Types d'événements comptés comme tirs cadrés quand la colonne `cadre`
+# (FotMob : isOnTarget) manque, p. ex. dans les CSV collectés avant son ajout
+TIRS_CADRES = ['Goal', 'SavedShot']
+
+
+class ShotIndex:
+    """Index des tirs par joueur.
+
+    Les tirs sont triés une seule fois par `joueur_id` ; les tirs d'un joueur
+    sont alors une tranche contiguë [debut, fin) renvoyée sans copie. Les
+    statistiques par joueur sont calculées en une passe à la construction.
+    """
+
+    def __init__(self, data):
+        ids = data['joueur_id'].to_numpy()
+        order = np.argsort(ids, kind='stable')
+        self.data = data.iloc[order].reset_index(drop=True)
+
+        ids = ids[order]
+        self.player_ids, self.starts, counts = np.unique(ids, return_index=True, return_counts=True)
+        self.ends = self.starts + counts
+        self._positions = {pid: i for i, pid in enumerate(self.player_ids.tolist())}
+        self.stats = self._calculer_stats(counts)
+
+    def _calculer_stats(self, counts):
+        """Tirs, buts, xG, xG/tir, x médian et tirs cadrés par joueur"""
+        colonnes = ['tirs', 'buts', 'xg', 'xg_par_tir', 'median_x', 'cadres']
+        if len(self.data) == 0:
+            return pd.DataFrame(columns=colonnes, index=pd.Index([], name='joueur_id'))
+
+        events = self.data['type_evenement']
+        xg = self.data['xg'].to_numpy(dtype=np.float64, na_value=0.0)
+        buts = np.add.reduceat((events == 'Goal').to_numpy(dtype=np.int64), self.starts)
+        cadres = np.add.reduceat(self._tirs_cadres(events).astype(np.int64), self.starts)
+        xg_sum = np.add.reduceat(xg, self.starts)
+        xg_count = np.add.reduceat(self.data['xg'].notna().to_numpy(dtype=np.int64), self.starts)
+
+        position_x = self.data['position_x'].to_numpy(dtype=np.float64, na_value=np.nan)
+        median_x = np.array([np.nanmedian(position_x[s:e]) if np.isfinite(position_x[s:e]).any() else np.nan
+                             for s, e in zip(self.starts, self.ends)])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            xg_par_tir = xg_sum / xg_count
+
+        return pd.DataFrame({
+            'tirs': counts,
+            'buts': buts,
+            'xg': xg_sum,
+            'xg_par_tir': xg_par_tir,
+            'median_x': median_x,
+            'cadres': cadres,
+        }, index=pd.Index(self.player_ids, name='joueur_id'))
+
+    def _tirs_cadres(self, events):
+        """Masque des tirs cadrés : isOnTarget si connu, sinon le type d'événement"""
+        cadres = events.isin(TIRS_CADRES).to_numpy()
+        if 'cadre' in self.data.columns:
+            cadre = self.data['cadre'].astype('boolean')
+            cadres = np.where(cadre.notna().to_numpy(), cadre.fillna(False).to_numpy(dtype=bool), cadres)
+        return cadres
+
+    def __contains__(self, player_id):
+        return player_id in self._positions
+
+    def shots(self, player_id):
+        """Tirs d'un joueur (tranche du DataFrame trié, vide si inconnu)"""
+        pos = self._positions.get(player_id)
+        if pos is None:
+            return self.data.iloc[0:0]
+        return self.data.iloc[self.starts[pos]:self.ends[pos]]
+
+    def stats_joueur(self, player_id):
+        """Statistiques résumées d'un joueur"""
+        return self.stats.loc[player_id]
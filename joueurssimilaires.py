@@ -1,15 +1,19 @@
-import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics.pairwise import cosine_similarity
-import difflib
 import streamlit as st
 import urllib.parse
+from similarite import SELECTED_FEATURES, MoteurGroupes, MoteurSimilarite, ordonner_par_groupe, preparer_features
+from index_ann import SEUIL_ANN, charger_ou_construire
+from index_noms import IndexNoms
+from donnees_joueurs import charger_joueurs
+from empreintes import empreinte_fichier
+from percentiles import version_fichier
 
-# Chargement des données
-@st.cache_data
+DATA_FILE = "df_BIG2025.csv"
+INDEX_ANN_FILE = "index_similarite.npz"
+
+# Chargement des données (lues et typées une fois par processus, partagées entre sessions)
 def load_data():
-    return pd.read_csv("df_BIG2025.csv")
+    return charger_joueurs(DATA_FILE)
 
 df = load_data()
 
@@ -19,43 +23,7 @@ if not all(col in df.columns for col in required_columns):
     raise ValueError(f"Les colonnes suivantes sont absentes du fichier CSV : {', '.join(required_columns)}")
 
 # Liste des features sélectionnées
-selected_features = [
-    'Matchs joues', 'Titularisations', 'Minutes jouees', 'Matches equivalents 90 minutes', 'Buts',
-    'Passes decisives', 'Buts + Passes decisives', 'Buts hors penalty', 'Penalty marques', 'Penalty tentes',
-    'Cartons jaunes', 'Cartons rouges', 'Buts attendus (xG)', 'Buts attendus hors penalty (npxG)',
-    'Passes decisives attendues (xAG)', 'xG + xAG hors penalty', 'Passes progressives', 'Courses progressives',
-    'Receptions progressives', 'Buts par 90 minutes', 'Passes decisives par 90 minutes', 'Buts + Passes decisives par 90 minutes',
-    'Buts hors penalty par 90 minutes', 'Buts + Passes decisives hors penalty par 90 min', 'xG par 90 minutes', 'xAG par 90 minutes',
-    'xG + xAG par 90 minutes', 'npxG par 90 minutes', 'npxG + xAG par 90 minutes', 'Actions menant a un tir',
-    'Actions menant a un tir par 90 minutes', 'Passes vivantes menant a un tir', 'Passes arretees menant a un tir',
-    'Ballons perdus menant a un tir', 'Tirs menant a un tir', 'Fautes subies menant a un tir', 'Actions defensives menant a un tir',
-    'Actions menant a un but', 'Actions menant a un but par 90 minutes', 'Passes vivantes menant a un but',
-    'Passes arretees menant a un but', 'Ballons perdus menant a un but', 'Tirs menant a un but', 'Fautes subies menant a un but',
-    'Actions defensives menant a un but', 'Passes reussies totales', 'Passes tentees totales',
-    'Pourcentage de reussite des passes', 'Distance totale des passes', 'Distance progressive des passes',
-    'Passes courtes reussies', 'Passes courtes tentees', 'Pourcentage de reussite des passes courtes',
-    'Passes moyennes reussies', 'Passes moyennes tentees', 'Pourcentage de reussite des passes moyennes',
-    'Passes longues reussies', 'Passes longues tentees', 'Pourcentage de reussite des passes longues', 'Passes attendues',
-    'Difference entre passes attendues et xAG', 'Passes cles', 'Passes vers le dernier tiers', 'Passes dans la surface adverse',
-    'Centres dans la surface adverse', 'Deuxieme carton jaune', 'Fautes commises', 'Fautes subies', 'Hors-jeux', 'Centres',
-    'Tacles reussis', 'Penalty obtenus', 'Penalty concedes', 'Buts contre son camp',
-    'Ballons recuperes', 'Duels aeriens gagnes', 'Duels aeriens perdus', 'Pourcentage de duels aeriens gagnes', 'Tirs',
-    'Tirs cadres', 'Pourcentage de tirs cadres', 'Tirs par 90 minutes', 'Tirs cadres par 90 minutes', 'Buts par tir',
-    'Buts par tir cadre', 'Distance moyenne des tirs', 'Coups francs', 'npxG par tir', 'Difference entre buts reels et xG',
-    'Difference entre buts reels hors penalty et npxG', 'Tacles', 'Tacles dans le tiers defensif', 'Tacles dans le tiers median',
-    'Tacles dans le tiers offensif', 'Tacles dans les duels', 'Duels tentes', 'Pourcentage de tacles reussis Tkl%', 'Duels perdus',
-    'Contres', 'Tirs contres', 'Passes contrees', 'Interceptions', 'Tacles + Interceptions', 'Degagements',
-    'Erreurs ayant conduit a un tir adverse', 'Minutes par match', 'Pourcentage de minutes jouees', 'Minutes par titularisation ',
-    'Matches completes', 'Remplacants', 'Minutes par entree', 'Matches non remplace', 'Points par match', 'Buts marques avec le joueur',
-    'Buts encaisses avec le joueur', 'Difference de buts avec le joueur', 'Difference de buts par 90 minutes',
-    'Difference avec/sans le joueur', 'xG marques avec le joueur ', 'xG encaisses avec le joueur', 'Difference de xG avec le joueur',
-    'Difference de xG par 90 minutes', 'Difference de xG avec/sans le joueur', 'Touches', 'Touches dans la surface defensive',
-    'Touches dans le tiers defensif', 'Touches dans le tier median', 'Touches dans le tiers offensif',
-    'Touches dans la surface offensive', 'Ballons en jeu', 'Dribbles tentes', 'Dribbles reussis', 'Pourcentage de dribbles reussis',
-    'Ballons perdus apres dribble', 'Pourcentage de ballons perdus apres dribble', 'Portees de balle',
-    'Distance totale parcourue avec le ballon', 'Distance progressive parcourue avec le ballon',
-    'Courses vers le dernier tiers', 'Courses dans la surface adverse'
-]
+selected_features = list(SELECTED_FEATURES)
 
 # Vérification des colonnes sélectionnées
 missing_features = [feature for feature in selected_features if feature not in df.columns]
@@ -63,15 +31,41 @@ if missing_features:
     st.warning(f"Les colonnes suivantes sont absentes : {missing_features}")
     selected_features = [feature for feature in selected_features if feature in df.columns]
 
-# Remplacement des valeurs manquantes par la moyenne
-df[selected_features] = df[selected_features].fillna(df[selected_features].mean())
+# Colonnes rangées par groupe : le moteur par groupes travaille sur des vues de la matrice
+selected_features = ordonner_par_groupe(selected_features)
+
+# Empreinte du fichier : les structures ci-dessous sont reconstruites quand il change
+empreinte = empreinte_fichier(DATA_FILE)
+
+# Moteur de similarité (features normalisées, construit une fois par version du fichier)
+# Au-delà de SEUIL_ANN joueurs, les requêtes passent par l'index IVF persisté
+@st.cache_resource(max_entries=2)
+def load_engine(features, empreinte):
+    data = load_data()
+    if len(data) < SEUIL_ANN:
+        return MoteurSimilarite(preparer_features(data, list(features)))
+    # L'échelle des features est celle persistée avec l'index
+    sources = [[DATA_FILE, version_fichier(DATA_FILE), len(data)]]
+    index, X = charger_ou_construire(INDEX_ANN_FILE, data, features, sources)
+    engine = MoteurSimilarite(X)
+    engine.ann = index
+    return engine
+
+engine = load_engine(tuple(selected_features), empreinte)
 
-# Normalisation des données
-scaler = MinMaxScaler()
-df[selected_features] = scaler.fit_transform(df[selected_features])
+# Moteur par groupes de features, pour la similarité pondérée (même matrice que `engine`)
+@st.cache_resource(max_entries=2)
+def load_group_engine(features, empreinte):
+    return MoteurGroupes.depuis_moteur(load_engine(features, empreinte), list(features))
 
-# Calcul de la similarité cosinus
-similarity_matrix = cosine_similarity(df[selected_features])
+group_engine = load_group_engine(tuple(selected_features), empreinte)
+
+# Index trigramme des noms (insensible aux accents), construit une fois par version du fichier
+@st.cache_resource(max_entries=2)
+def load_name_index(empreinte):
+    return IndexNoms(load_data()['Joueur'])
+
+name_index = load_name_index(empreinte)
 
 # Fonction pour générer l'URL du logo avec encodage des caractères spéciaux
 def get_logo_url(equipe, league):
@@ -91,17 +85,13 @@ def get_logo_url(equipe, league):
     return logo_url
 
 # Fonction pour trouver les joueurs similaires
-def find_similar_players(player_name, league, top_n=10):
-    # Recherche des correspondances proches
-    list_of_all_players = df['Joueur'].tolist()
-    find_close_match = difflib.get_close_matches(player_name.lower(), [p.lower() for p in list_of_all_players], cutoff=0.4)
-    if not find_close_match:
+def find_similar_players(player_name, league, top_n=10, poids=None):
+    # Recherche du nom le plus proche (accents et casse ignorés)
+    player_index = name_index.meilleur(player_name)
+    if player_index is None:
         st.warning(f"Aucun joueur trouvé pour '{player_name}'. Veuillez vérifier l'orthographe.")
         return []
 
-    # Correspondance exacte (avec casse correcte)
-    close_match = next(p for p in list_of_all_players if p.lower() == find_close_match[0])
-
     # Filtrer par ligue
     filtered_df = df[df['Compétition'] == league]
 
@@ -109,25 +99,22 @@ def find_similar_players(player_name, league, top_n=10):
         st.warning(f"Aucun joueur similaire trouvé dans la Compétition '{league}'.")
         return []
 
-    # Index du joueur trouvé
-    player_index = df[df['Joueur'] == close_match].index[0]
-
-    # Calcul de la similarité pour les joueurs filtrés
-    filtered_indices = filtered_df.index
-    similarity_scores = [(i, similarity_matrix[player_index][i]) for i in filtered_indices]
-
-    # Tri par score décroissant
-    sorted_similar_players = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
+    # Top-k des joueurs filtrés : un produit matrice-vecteur + argpartition
+    candidats = filtered_df.index.to_numpy()
+    if poids and any(w != 1 for w in poids.values()):
+        top_indices, top_scores = group_engine.top_k(player_index, top_n, poids=poids, candidats=candidats)
+    else:
+        top_indices, top_scores = engine.top_k(player_index, top_n, candidats=candidats)
 
     # Récupération des joueurs similaires
     similar_players = []
-    for i, (index, score) in enumerate(sorted_similar_players[:top_n]):
-        player = filtered_df.loc[index, 'Joueur']
-        
-        # Exclure le joueur lui-même de la liste
-        if player == player_name:
+    for index, score in zip(top_indices, top_scores):
+        # Exclure le joueur lui-même de la liste (ligne trouvée, pas le texte saisi)
+        if index == player_index:
             continue
 
+        player = filtered_df.loc[index, 'Joueur']
+
         equipe = filtered_df.loc[index, 'Équipe']
         league = filtered_df.loc[index, 'Compétition']
 
@@ -152,6 +139,13 @@ selected_league = st.selectbox("Choisissez une ligue :", leagues)
 # Sélection du nombre de joueurs similaires
 top_n = st.slider("Nombre de joueurs similaires :", 1, 20, 10)
 
+# Pondération des groupes de statistiques (0 = groupe ignoré)
+with st.expander("Pondération par groupe de statistiques"):
+    poids = {
+        groupe: st.slider(groupe, 0.0, 3.0, 1.0, 0.25, key=f"poids_{groupe}")
+        for groupe in group_engine.groupes
+    }
+
 # Recherche et affichage des joueurs similaires
 if st.button("Trouver des joueurs similaires"):
     if not player_name:
@@ -159,7 +153,7 @@ if st.button("Trouver des joueurs similaires"):
     elif not selected_league:
         st.warning("Veuillez sélectionner une ligue.")
     else:
-        similar_players = find_similar_players(player_name, selected_league, top_n)
+        similar_players = find_similar_players(player_name, selected_league, top_n, poids)
 
         if similar_players:
             st.subheader(f"Joueurs similaires à {player_name} dans la ligue {selected_league} :")
@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import numpy as np
+from donnees_joueurs import charger_joueurs
+from rendu_nuage import creer_nuage, decimer, placer_labels
 
-# Charger les données
-df = pd.read_csv("df_BIG2025.csv")
+# Charger les données (lues et typées une fois par processus)
+df = charger_joueurs("df_BIG2025.csv")
 
 # Filtrer les colonnes numériques
 numerical_columns = df.select_dtypes(include=['number']).columns.tolist()
@@ -24,16 +25,16 @@ selected_competitions = st.sidebar.multiselect("Sélectionner les compétitions"
 min_minutes = st.sidebar.slider("Nombre minimum de minutes jouées", min_value=0, max_value=int(df["Minutes jouées"].max()), value=500)
 
 # Nombre de labels de joueurs
-num_labels = st.sidebar.slider("Nombre de labels à afficher", min_value=0, max_value=50, value=10)
+num_labels = st.sidebar.slider("Nombre de labels à afficher", min_value=0, max_value=300, value=10)
 label_size = st.sidebar.slider("Taille de texte des labels", min_value=2, max_value=8, value=5)
 
+# Rendu : WebGL automatique pour les grands nuages, agrégation optionnelle du cœur dense
+rendu = st.sidebar.selectbox("Rendu", ["Automatique", "WebGL", "SVG"])
+mode_densite = st.sidebar.checkbox("Agréger les zones denses", value=False)
+
 # Filtrer les données
 filtered_df = df[(df["Compétition"].isin(selected_competitions)) & (df["Minutes jouées"] >= min_minutes)]
 
-# Convertir en numérique pour éviter les erreurs
-filtered_df[x_axis] = pd.to_numeric(filtered_df[x_axis], errors='coerce')
-filtered_df[y_axis] = pd.to_numeric(filtered_df[y_axis], errors='coerce')
-
 # Sélectionner les meilleurs joueurs pour les labels
 top_10_x = filtered_df.nlargest(num_labels, x_axis)
 top_10_y = filtered_df.nlargest(num_labels, y_axis)
@@ -44,36 +45,31 @@ top_10_combined = pd.concat([top_10_x, top_10_y]).drop_duplicates(subset="Joueur
 # S'assurer que le nombre de labels affichés correspond au nombre sélectionné
 top_10_combined = top_10_combined.head(num_labels)
 
-# Création du graphique avec **TOUS** les joueurs
-fig = px.scatter(filtered_df, x=x_axis, y=y_axis, hover_data=["Joueur", "Équipe", "Compétition"], color="Compétition")
-
-# Dictionnaire pour suivre le nombre d'occurrences de chaque X
-x_counts = top_10_combined[x_axis].value_counts().to_dict()
-x_positions = {}  # Suivi des positions pour alterner à gauche/droite
-
-# Ajouter des annotations avec alternance des labels à gauche et à droite si nécessaire
-for i, row in top_10_combined.iterrows():
-    x_val = row[x_axis]
-    y_val = row[y_axis]
-
-    # Déterminer si on met le label à gauche ou à droite
-    if x_counts[x_val] > 1:
-        if x_val in x_positions:
-            x_positions[x_val] += 1
-        else:
-            x_positions[x_val] = 0
-        shift = (-0.02 if x_positions[x_val] % 2 == 0 else 0.02) * (filtered_df[x_axis].max() - filtered_df[x_axis].min())
-    else:
-        shift = 0
-
-    fig.add_annotation(
-        x=x_val + shift,  # Déplacement horizontal des labels si besoin
-        y=y_val + (filtered_df[y_axis].max() - filtered_df[y_axis].min()) * 0.02,  # Décalage léger vers le haut
-        text=row["Joueur"],  
-        showarrow=False,  
+# Création du graphique : tous les joueurs, ou seulement les points isolés, extrêmes et labellisés
+if mode_densite:
+    points_df, denses = decimer(filtered_df, x_axis, y_axis, a_garder=top_10_combined.index)
+else:
+    points_df, denses = filtered_df, None
+webgl = {"Automatique": None, "WebGL": True, "SVG": False}[rendu]
+fig = creer_nuage(points_df, x_axis, y_axis, hover_data=["Joueur", "Équipe", "Compétition"],
+                  color="Compétition", webgl=webgl, denses=denses)
+
+# Placement des labels en une passe, sans chevauchement (grille spatiale)
+x_range = (filtered_df[x_axis].min(), filtered_df[x_axis].max())
+y_range = (filtered_df[y_axis].min(), filtered_df[y_axis].max())
+label_x, label_y = placer_labels(top_10_combined[x_axis], top_10_combined[y_axis],
+                                 top_10_combined["Joueur"], label_size, x_range, y_range)
+fig.update_layout(annotations=[
+    dict(
+        x=lx,
+        y=ly,
+        text=joueur,
+        showarrow=False,
         font=dict(size=label_size, color="white"),
         bgcolor="rgba(0,0,0,0)"  # Fond transparent
     )
+    for lx, ly, joueur in zip(label_x, label_y, top_10_combined["Joueur"])
+])
 
 # Ajuster le layout
 fig.update_layout(
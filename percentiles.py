@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Cache des centiles : mémoire (LRU) et, si PERCENTILES_CACHE_DIR est défini, disque
+TAILLE_MAX_COHORTES = 128
+DOSSIER_PERCENTILES = os.environ.get('PERCENTILES_CACHE_DIR')
+
+# Cohorte de joueurs dont on calcule les centiles
+CleCohorte = namedtuple('CleCohorte', ['version', 'competition', 'position', 'filtre', 'stats', 'methode'])
+
+
+def _en_float64(serie):
+    """Valeurs en float64 ; un float32 repasse par sa représentation décimale
+    la plus courte pour retrouver exactement la valeur du CSV (et ses égalités)"""
+    if serie.dtype == np.float32:
+        return serie.to_numpy().astype(str).astype(np.float64)
+    return pd.to_numeric(serie, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def matrice_percentiles(df, colonnes, col_90="Matchs en 90 min"):
+    """Rangs centiles (0-100) de tous les joueurs pour toutes les statistiques.
+
+    Même règle que le calcul joueur par joueur : chaque stat est ramenée
+    aux 90 minutes (sauf si elle l'est déjà ou est un pourcentage), le
+    centile est la part des joueurs du groupe strictement inférieurs, et
+    vaut 0 si la valeur du joueur est manquante. Une seule passe par stat :
+    tri de la distribution puis searchsorted pour tous les joueurs.
+    Renvoie un DataFrame (index de `df` × `colonnes`) d'entiers.
+    """
+    n = len(df)
+    matrice = np.zeros((n, len(colonnes)), dtype=np.int16)
+    if n == 0:
+        return pd.DataFrame(matrice, index=df.index, columns=colonnes)
+
+    m90 = _en_float64(df[col_90])
+    for j, col in enumerate(colonnes):
+        if col not in df.columns:
+            continue
+        valeurs = _en_float64(df[col])
+        invalides = np.isnan(valeurs)
+        if not ("par 90 minutes" in col or "%" in col):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                valeurs = valeurs / m90
+            invalides |= (m90 == 0) | np.isnan(valeurs)
+
+        distribution = np.sort(valeurs[~np.isnan(valeurs)])
+        rangs = np.searchsorted(distribution, valeurs, side='left')
+        pct = np.rint(rangs / n * 100)
+        pct[invalides] = 0
+        matrice[:, j] = pct
+
+    return pd.DataFrame(matrice, index=df.index, columns=colonnes)
+
+
+def rangs_percentiles(df, colonnes, col_90="Matchs en 90 min"):
+    """Rangs centiles façon `rank(pct=True)` des stats ramenées aux 90 minutes"""
+    valeurs = df[colonnes].astype(float).div(df[col_90], axis=0)
+    return (valeurs.rank(pct=True) * 100).astype(int)
+
+
+def version_fichier(path):
+    """Version d'un jeu de données : change dès que le fichier est modifié"""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class PercentileStore:
+    """Matrices de centiles partagées par les applications, par cohorte.
+
+    Les entrées sont indexées par `CleCohorte` et gardées en mémoire avec
+    éviction LRU ; si `dossier` est fourni, elles sont aussi persistées sur
+    disque et rechargées sans recalcul au prochain démarrage.
+    """
+
+    def __init__(self, taille_max=TAILLE_MAX_COHORTES, dossier=DOSSIER_PERCENTILES):
+        self.taille_max = taille_max
+        self.dossier = dossier
+        self._entrees = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _chemin(self, cle):
+        empreinte = hashlib.sha256(repr(tuple(cle)).encode('utf-8')).hexdigest()
+        return os.path.join(self.dossier, f"{empreinte}.pkl")
+
+    def get(self, cle, calcul):
+        """Matrice de la cohorte `cle`, calculée par `calcul()` si absente"""
+        with self._lock:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+                return self._entrees[cle]
+
+        matrice = None
+        if self.dossier:
+            try:
+                matrice = pd.read_pickle(self._chemin(cle))
+            except (OSError, EOFError, ValueError):
+                matrice = None
+        if matrice is None:
+            matrice = calcul()
+            if self.dossier:
+                os.makedirs(self.dossier, exist_ok=True)
+                chemin = self._chemin(cle)
+                matrice.to_pickle(f"{chemin}.tmp")
+                os.replace(f"{chemin}.tmp", chemin)
+
+        with self._lock:
+            self._entrees[cle] = matrice
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+        return matrice
+
+
+_store = PercentileStore()
+
+
+def get_percentile_store():
+    """Store partagé par toutes les sessions du processus"""
+    return _store
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Au-delà de ce nombre de points, le nuage est rendu en WebGL (scattergl)
+SEUIL_WEBGL = 1000
+# Décimation : grille NB_CASES × NB_CASES, une case est « dense » au-delà de MAX_PAR_CASE points
+NB_CASES = 120
+MAX_PAR_CASE = 5
+# Quantiles hors desquels un point est toujours conservé (valeurs extrêmes)
+QUANTILES_EXTREMES = (0.01, 0.99)
+
+
+def decimer(df, x_axis, y_axis, a_garder=None, nb_cases=NB_CASES, max_par_case=MAX_PAR_CASE):
+    """Sépare les points à dessiner un par un du cœur dense du nuage.
+
+    Sont conservés : les points des cases peu peuplées, les valeurs
+    extrêmes sur l'un des deux axes et les joueurs de `a_garder` (index de
+    `df`, p. ex. ceux qui portent un label). Les autres points sont agrégés
+    par case. Renvoie (points conservés, cases denses avec x, y, nb_joueurs).
+    """
+    x = df[x_axis].to_numpy(dtype=np.float64)
+    y = df[y_axis].to_numpy(dtype=np.float64)
+    valides = ~(np.isnan(x) | np.isnan(y))
+    if not valides.any():
+        return df, pd.DataFrame(columns=[x_axis, y_axis, 'nb_joueurs'])
+
+    def cases(v):
+        vmin, vmax = np.nanmin(v), np.nanmax(v)
+        etendue = (vmax - vmin) or 1.0
+        return np.clip(((v - vmin) / etendue * nb_cases).astype(np.int64, copy=False), 0, nb_cases - 1)
+
+    cx = cases(np.where(valides, x, np.nanmin(x)))
+    cy = cases(np.where(valides, y, np.nanmin(y)))
+    case = cx * nb_cases + cy
+    comptes = np.bincount(case[valides], minlength=nb_cases * nb_cases)
+
+    garder = ~valides | (comptes[case] <= max_par_case)
+    for v in (x, y):
+        bas, haut = np.nanquantile(v, QUANTILES_EXTREMES)
+        garder |= (v < bas) | (v > haut)
+    if a_garder is not None:
+        garder |= df.index.isin(a_garder)
+
+    agreges = ~garder
+    denses = pd.DataFrame({
+        x_axis: x[agreges], y_axis: y[agreges], 'case': case[agreges],
+    }).groupby('case').agg(**{
+        x_axis: (x_axis, 'mean'), y_axis: (y_axis, 'mean'), 'nb_joueurs': (x_axis, 'size'),
+    }).reset_index(drop=True)
+    return df[garder], denses
+
+
+def creer_nuage(df, x_axis, y_axis, hover_data, color, webgl=None, denses=None):
+    """Nuage de points plotly ; WebGL automatique au-delà de SEUIL_WEBGL points.
+
+    `denses` (sortie de `decimer`) est dessiné comme une trace agrégée dont
+    la taille des marqueurs suit le nombre de joueurs par case.
+    """
+    nb_points = len(df) + (0 if denses is None else len(denses))
+    if webgl is None:
+        webgl = nb_points > SEUIL_WEBGL
+    fig = px.scatter(df, x=x_axis, y=y_axis, hover_data=hover_data, color=color,
+                     render_mode='webgl' if webgl else 'svg')
+
+    if denses is not None and len(denses):
+        taille = 4 + 10 * np.sqrt(denses['nb_joueurs'] / denses['nb_joueurs'].max())
+        trace = go.Scattergl if webgl else go.Scatter
+        fig.add_trace(trace(
+            x=denses[x_axis], y=denses[y_axis], mode='markers',
+            name=f"Zone dense ({int(denses['nb_joueurs'].sum())} joueurs)",
+            marker=dict(size=taille, color='rgba(150,150,150,0.45)', line=dict(width=0)),
+            customdata=denses['nb_joueurs'],
+            hovertemplate="%{customdata} joueurs<extra></extra>",
+        ))
+    return fig
+
+
+# Taille supposée du graphique (px) pour convertir la taille des labels en unités des axes
+LARGEUR_PX = 700
+HAUTEUR_PX = 450
+# Positions candidates d'un label autour de son point, par ordre de préférence
+DIRECTIONS_LABELS = np.array([
+    (0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1),
+    (0, 2.5), (2, 0), (-2, 0), (0, -2.5), (2, 2.5), (-2, 2.5), (2, -2.5), (-2, -2.5),
+], dtype=np.float64)
+
+
+class _GrilleSpatiale:
+    """Rectangles indexés par case d'une grille régulière (tests de chevauchement locaux)"""
+
+    def __init__(self, taille_case_x, taille_case_y):
+        self.tx = taille_case_x
+        self.ty = taille_case_y
+        self.cases = {}
+        self.boites = []
+
+    def _cases(self, x0, x1, y0, y1):
+        for i in range(int(np.floor(x0 / self.tx)), int(np.floor(x1 / self.tx)) + 1):
+            for j in range(int(np.floor(y0 / self.ty)), int(np.floor(y1 / self.ty)) + 1):
+                yield i, j
+
+    def chevauche(self, x0, x1, y0, y1):
+        for case in self._cases(x0, x1, y0, y1):
+            for k in self.cases.get(case, ()):
+                bx0, bx1, by0, by1 = self.boites[k]
+                if x0 < bx1 and bx0 < x1 and y0 < by1 and by0 < y1:
+                    return True
+        return False
+
+    def ajouter(self, x0, x1, y0, y1):
+        k = len(self.boites)
+        self.boites.append((x0, x1, y0, y1))
+        for case in self._cases(x0, x1, y0, y1):
+            self.cases.setdefault(case, []).append(k)
+
+
+def placer_labels(x, y, textes, taille_police, x_range, y_range,
+                  largeur_px=LARGEUR_PX, hauteur_px=HAUTEUR_PX):
+    """Positions (centres) des labels des points (x, y), sans chevauchement si possible.
+
+    Les boîtes de tous les labels et leurs positions candidates
+    (DIRECTIONS_LABELS) sont calculées d'un coup ; chaque label prend, dans
+    l'ordre de priorité des points, la première position libre vis-à-vis
+    des labels déjà placés et des points labellisés (grille spatiale). À
+    défaut, il reste au-dessus de son point. Les points dont x ou y est
+    manquant gardent une position NaN (label non affiché).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return x, y
+
+    px_x = ((x_range[1] - x_range[0]) or 1.0) / largeur_px
+    px_y = ((y_range[1] - y_range[0]) or 1.0) / hauteur_px
+    longueurs = np.array([len(str(t)) for t in textes], dtype=np.float64)
+    demi_l = (longueurs * 0.6 * taille_police + 4) / 2 * px_x
+    demi_h = (1.3 * taille_police + 2) / 2 * px_y
+    marge_x, marge_y = 3 * px_x, 3 * px_y
+
+    # (n, nb_directions) centres candidats
+    cx = x[:, None] + DIRECTIONS_LABELS[:, 0] * (demi_l[:, None] + marge_x)
+    cy = y[:, None] + DIRECTIONS_LABELS[:, 1] * (demi_h + marge_y)
+
+    # Un point sans coordonnée (NaN) n'est ni placé ni utilisé comme obstacle
+    finis = np.isfinite(x) & np.isfinite(y)
+
+    grille = _GrilleSpatiale(max(2 * demi_l.mean(), px_x), 2 * demi_h)
+    rayon_x, rayon_y = 3 * px_x, 3 * px_y
+    for xi, yi in zip(x[finis], y[finis]):
+        grille.ajouter(xi - rayon_x, xi + rayon_x, yi - rayon_y, yi + rayon_y)
+
+    lx, ly = cx[:, 0].copy(), cy[:, 0].copy()
+    for i in np.flatnonzero(finis):
+        for c in range(len(DIRECTIONS_LABELS)):
+            boite = (cx[i, c] - demi_l[i], cx[i, c] + demi_l[i], cy[i, c] - demi_h, cy[i, c] + demi_h)
+            if not grille.chevauche(*boite):
+                lx[i], ly[i] = cx[i, c], cy[i, c]
+                break
+        grille.ajouter(lx[i] - demi_l[i], lx[i] + demi_l[i], ly[i] - demi_h, ly[i] + demi_h)
+    return lx, ly
@@ -0,0 +1,202 @@
+import os
+import urllib.request
+
+import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
+import matplotlib.font_manager as fm
+import numpy as np
+from mplsoccer import VerticalPitch
+
+from cache_images import get_asset_store, url_logo_equipe, url_photo_joueur
+
+# Configuration de la police Montserrat
+font_url = "https://github.com/googlefonts/Montserrat/raw/main/fonts/ttf/Montserrat-Regular.ttf"
+font_path = 'Montserrat-Regular.ttf'
+if not os.path.exists(font_path):
+    urllib.request.urlretrieve(font_url, font_path)
+
+fm.fontManager.addfont(font_path)
+prop = fm.FontProperties(fname=font_path)
+plt.rcParams['font.family'] = prop.get_name()
+
+# Configuration des ligues
+LEAGUE_THEMES = {
+    'LIGUE 1': {
+        'name': 'LIGUE 1', 'id': 53, 'slug': 'ligue1',
+        'background': '#000d24', 'accent': '#085eff', 'text': '#ffffff',
+        'gradient': ['#000d24', '#042a70', '#085eff', '#5c95ff', '#ffffff']
+    },
+    'PREMIER LEAGUE': {
+        'name': 'PREMIER LEAGUE', 'id': 47, 'slug': 'premier_league',
+        'background': '#360d3a', 'accent': '#e90052', 'text': '#ffffff',
+        'gradient': ['#360d3a', '#6a1b6e', '#963cff', '#e90052', '#ffffff']
+    },
+    'LA LIGA': {
+        'name': 'LA LIGA', 'id': 87, 'slug': 'la_liga',
+        'background': '#140505', 'accent': '#FF4B44', 'text': '#ffeaea',
+        'gradient': ['#140505', '#5c1210', '#b92b27', '#FF4B44', '#ffffff']
+    },
+    'BUNDESLIGA': {
+        'name': 'BUNDESLIGA', 'id': 54, 'slug': 'bundesliga',
+        'background': '#120203', 'accent': '#D3010C', 'text': '#ffffff',
+        'gradient': ['#120203', '#4a0508', '#9e0b12', '#D3010C', '#ffffff']
+    },
+    'SERIE A': {
+        'name': 'SERIE A', 'id': 55, 'slug': 'serie_a',
+        'background': '#020914', 'accent': '#0578FF', 'text': '#f0f9ff',
+        'gradient': ['#020914', '#032d66', '#0578FF', '#66adff', '#ffffff']
+    },
+    'CHAMPIONS LEAGUE': {
+        'name': 'CHAMPIONS LEAGUE', 'id': 42, 'slug': 'ucl',
+        'background': '#001967', 'accent': '#38bdf8', 'text': '#ffffff',
+        'gradient': ['#001967', '#0f3da8', '#38bdf8', '#a5f3fc', '#ffffff']
+    },
+    'EUROPA LEAGUE': {
+        'name': 'EUROPA LEAGUE', 'id': 73, 'slug': 'uel',
+        'background': '#170f00', 'accent': '#f8ad09', 'text': '#fffbeb',
+        'gradient': ['#170f00', '#5c3d02', '#b47b05', '#f8ad09', '#ffffff']
+    }
+}
+
+# Colonnes lues par la vue shotmaps (stockage colonnaire)
+COLONNES_SHOTMAP = [
+    'joueur_id', 'joueur', 'equipe_id', 'equipe_joueur', 'saison',
+    'type_evenement', 'xg', 'situation', 'position_x', 'position_y', 'cadre'
+]
+
+def semicircle(r, h, k):
+    """Génère un demi-cercle"""
+    x0, x1 = h - r, h + r
+    x = np.linspace(x0, x1, 500)
+    y = k - np.sqrt(r**2 - (x - h)**2)
+    return x, y
+
+def create_shotmap(index, player_id, theme, player_info, size='normal'):
+    """Crée une carte de tirs avec photo du joueur et barre de densité"""
+    if size == 'large':
+        figsize = (10, 13)
+        font_sizes = {'title': 14, 'stats_label': 8, 'stats_value': 14, 'distance': 9}
+    else:
+        figsize = (6, 8)
+        font_sizes = {'title': 10, 'stats_label': 6, 'stats_value': 10, 'distance': 7}
+    
+    fig, ax = plt.subplots(figsize=figsize, facecolor=theme['background'])
+    ax.set_facecolor(theme['background'])
+    
+    pitch = VerticalPitch(
+        pitch_type='uefa', half=True, goal_type='box',
+        linewidth=1.5, line_color=mcolors.to_hex(mcolors.to_rgba(theme['text'], alpha=0.2)),
+        pad_bottom=-10, pad_top=15, pitch_color=theme['background']
+    )
+    pitch.draw(ax=ax)
+    
+    player_data = index.shots(player_id)
+    player_stats = index.stats_joueur(player_id)
+    cmap = mcolors.LinearSegmentedColormap.from_list('LeagueTheme', theme['gradient'], N=100)
+    
+    # Hexbins améliorés avec bordures blanches épaisses et alpha élevé
+    hexbin = pitch.hexbin(
+        x=player_data['position_x'], y=player_data['position_y'], 
+        ax=ax, cmap=cmap, gridsize=(16, 16), zorder=2, 
+        edgecolors='white', linewidths=1.8, alpha=1.0, mincnt=1
+    )
+    
+    median_x = player_stats['median_x']
+    x_circle, y_circle = semicircle(104.8 - median_x, 34, 104.8)
+    ax.plot(x_circle, y_circle, ls='--', color=theme['accent'], lw=2, alpha=0.6, zorder=3)
+    
+    stats = {
+        'TIRS': player_stats['tirs'],
+        'BUTS': player_stats['buts'],
+        'xG': player_stats['xg'],
+        'xG/TIR': player_stats['xg_par_tir']
+    }
+    
+    on_target = player_stats['cadres']
+    accuracy = (on_target / stats['TIRS'] * 100) if stats['TIRS'] > 0 else 0
+    
+    stat_y_start = 60
+    for i, (label, value) in enumerate(stats.items()):
+        x_pos = 10 + (i * 14.5)
+        ax.text(x_pos, stat_y_start, label, 
+                ha='center', va='bottom', fontsize=font_sizes['stats_label'], 
+                color=mcolors.to_hex(mcolors.to_rgba(theme['text'], alpha=0.6)), 
+                weight='bold', fontfamily='Montserrat')
+        val_fmt = f"{value:.0f}" if label in ['TIRS', 'BUTS'] else f"{value:.2f}"
+        ax.text(x_pos, stat_y_start - 2, val_fmt, 
+                ha='center', va='top', fontsize=font_sizes['stats_value'], 
+                color=theme['accent'], weight='heavy', fontfamily='Montserrat')
+    
+    dist_yds = ((105 - median_x) * 18) / 16.5
+    dist_m = dist_yds * 0.9144
+    
+    info_text = f"Distance Médiane: {dist_m:.1f}m  |  Précision: {accuracy:.0f}%"
+    ax.text(34, 108, info_text,
+            ha='center', va='center', fontsize=font_sizes['distance'],
+            color=theme['text'], weight='bold', fontfamily='Montserrat',
+            bbox=dict(facecolor=theme['background'], edgecolor=theme['accent'], 
+                     boxstyle='round,pad=0.5', alpha=0.9, linewidth=2))
+    
+    # Titre avec nom du joueur
+    player_name = player_info['joueur'].upper()
+    ax.text(34, 120, player_name, 
+            ha='center', va='center', fontsize=font_sizes['title'], 
+            color=theme['text'], weight='black', fontfamily='Montserrat',
+            bbox=dict(facecolor=theme['background'], edgecolor='none', 
+                     boxstyle='round,pad=0.7', alpha=0.8))
+    
+    # Sous-titre avec équipe et saison
+    team_name = player_info['equipe_joueur']
+    season = player_info['saison']
+    subtitle_text = f"{team_name} | {season}"
+    ax.text(34, 115, subtitle_text, 
+            ha='center', va='center', fontsize=font_sizes['distance'], 
+            color=mcolors.to_hex(mcolors.to_rgba(theme['text'], alpha=0.7)), 
+            weight='semibold', fontfamily='Montserrat')
+    
+    ax.plot([20, 48], [112, 112], color=theme['accent'], lw=3, alpha=0.9)
+    
+    # Logo de l'équipe et photo du joueur (cache local, jamais deux fois au réseau)
+    assets = get_asset_store()
+    team_id = player_data["equipe_id"].iloc[0]
+    icon = assets.get(url_logo_equipe(team_id))
+    if icon is not None:
+        logo_ax = ax.inset_axes([0.05, 0.88, 0.15, 0.15])
+        logo_ax.imshow(icon)
+        logo_ax.axis('off')
+    
+    player_icon = assets.get(url_photo_joueur(player_id))
+    if player_icon is not None:
+        player_logo_ax = ax.inset_axes([0.80, 0.88, 0.15, 0.15])
+        player_logo_ax.imshow(player_icon)
+        player_logo_ax.axis('off')
+    
+    # Description des hexbins en bas de la shotmap
+    density_text = "Hexbins : plus la couleur est claire, plus la fréquence de tirs est élevée"
+    ax.text(34, 50, density_text,
+            ha='center', va='center', fontsize=font_sizes['distance']-1,
+            color=mcolors.to_hex(mcolors.to_rgba(theme['text'], alpha=0.7)), 
+            style='italic', fontfamily='Montserrat')
+    
+    plt.tight_layout()
+    return fig
+
+
+def images_disponibles(index, player_id):
+    """True si le logo de l'équipe et la photo du joueur sont disponibles (store local)"""
+    assets = get_asset_store()
+    shots = index.shots(player_id)
+    return (len(shots) > 0
+            and assets.get(url_logo_equipe(shots["equipe_id"].iloc[0])) is not None
+            and assets.get(url_photo_joueur(player_id)) is not None)
+
+
+def prefetch_assets(index, player_ids):
+    """Précharge en parallèle logos et photos des joueurs à afficher"""
+    urls = []
+    for player_id in player_ids:
+        shots = index.shots(player_id)
+        if len(shots):
+            urls.append(url_logo_equipe(shots["equipe_id"].iloc[0]))
+        urls.append(url_photo_joueur(player_id))
+    get_asset_store().prefetch(urls)
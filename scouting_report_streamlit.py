@@ -1,4 +1,7 @@
+import hashlib
+import os
 import streamlit as st
+import joblib
 import pandas as pd
 import numpy as np
 import plotly.express as px
@@ -6,7 +9,8 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
+from sklearn.neighbors import KDTree
+from donnees_scouting import charger_joueurs_scouting, generer_joueurs
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -90,101 +94,72 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Données simulées basées sur le rapport CIES
+# Données simulées basées sur le rapport CIES (voir donnees_scouting.py).
+# SCOUTING_DATA_FILE : fichier pré-généré ; sinon SCOUTING_N_PLAYERS joueurs générés
+N_PLAYERS = int(os.environ.get('SCOUTING_N_PLAYERS', 500))
+DATA_FILE = os.environ.get('SCOUTING_DATA_FILE')
+
 @st.cache_data
 def load_data():
-    np.random.seed(42)
-    
-    # Catégories de joueurs basées sur le rapport CIES
-    categories = [
-        'Short-passes Goalkeepers', 'Long-passes Goalkeepers',
-        'Full Defence Centre Backs', 'Allrounder Centre Backs', 'Build-up Centre Backs',
-        'Defensive Left Full/Wing Backs', 'Attacking Left Full/Wing Backs',
-        'Defensive Right Full/Wing Backs', 'Attacking Right Full/Wing Backs',
-        'Holding Midfielders', 'Playmaking Midfielders', 'Assisting Midfielders',
-        'Infiltrating Midfielders', 'Shooting Midfielders',
-        'Infiltrating Left Wingers', 'Assisting/Shooting Left Wingers',
-        'Infiltrating Right Wingers', 'Assisting/Shooting Right Wingers',
-        'Allrounder Centre Forwards', 'Target Man Centre Forwards'
-    ]
-    
-    # Noms de joueurs réels du rapport
-    top_players = [
-        'Lamine Yamal', 'Warren Zaïre-Emery', 'João Neves', 'Pau Cubarsí',
-        'Kendry Páez', 'Alejandro Garnacho', 'Kenan Yildiz', 'Rico Lewis',
-        'Jorrel Hato', 'Sávio Moreira', 'Kobbie Mainoo', 'Endrick Felipe',
-        'Malick Diouf', 'Martim Fernandes', 'Geovany Quenda', 'Claudio Echeverri',
-        'Carlos Baleba', 'Aleksandar Pavlović', 'Mario Stroeykens', 'Samu Aghehowa'
-    ]
-    
-    clubs = [
-        'FC Barcelona', 'Paris St-Germain', 'Manchester United', 'Real Madrid',
-        'Manchester City', 'Juventus', 'Ajax', 'Porto', 'Sporting CP',
-        'Brighton & Hove', 'Chelsea', 'Arsenal', 'Bayern München'
-    ]
-    
-    leagues = [
-        'La Liga', 'Premier League', 'Ligue 1', 'Serie A', 'Bundesliga',
-        'Eredivisie', 'Primeira Liga', 'Pro League'
-    ]
-    
-    countries = [
-        'Spain', 'France', 'England', 'Germany', 'Brazil', 'Argentina',
-        'Portugal', 'Netherlands', 'Italy', 'Belgium', 'Turkey', 'Ecuador'
-    ]
-    
-    n_players = 500
-    
-    data = {
-        'name': np.random.choice(top_players + [f'Player_{i}' for i in range(100)], n_players),
-        'age': np.random.uniform(17, 21, n_players),
-        'category': np.random.choice(categories, n_players),
-        'club': np.random.choice(clubs, n_players),
-        'league': np.random.choice(leagues, n_players),
-        'country': np.random.choice(countries, n_players),
-        'performance_index': np.random.uniform(50, 95, n_players),
-        'transfer_value_min': np.random.uniform(1, 50, n_players),
-        'transfer_value_max': np.random.uniform(5, 100, n_players),
-        'ground_defence': np.random.uniform(0, 100, n_players),
-        'aerial_play': np.random.uniform(0, 100, n_players),
-        'distribution': np.random.uniform(0, 100, n_players),
-        'chance_creation': np.random.uniform(0, 100, n_players),
-        'take_on': np.random.uniform(0, 100, n_players),
-        'finishing': np.random.uniform(0, 100, n_players),
-        'minutes_played': np.random.randint(500, 3000, n_players),
-        'goals': np.random.randint(0, 25, n_players),
-        'assists': np.random.randint(0, 20, n_players),
-        'yellow_cards': np.random.randint(0, 10, n_players),
-        'red_cards': np.random.randint(0, 3, n_players)
-    }
-    
-    df = pd.DataFrame(data)
-    df['transfer_value_avg'] = (df['transfer_value_min'] + df['transfer_value_max']) / 2
-    
-    return df
+    if DATA_FILE:
+        return charger_joueurs_scouting(DATA_FILE)
+    return generer_joueurs(N_PLAYERS, seed=42)
+
+# Features du modèle de potentiel
+FEATURES = ['age', 'performance_index', 'ground_defence', 'aerial_play',
+            'distribution', 'chance_creation', 'take_on', 'finishing',
+            'minutes_played', 'goals', 'assists']
+TARGET = 'transfer_value_avg'
+
+# En dessous de ce nombre de joueurs filtrés, les voisins sont cherchés par force brute
+SEUIL_FORCE_BRUTE = 5000
+
+# Forêt du modèle de potentiel (entraînement parallèle sur tous les cœurs)
+FOREST_PARAMS = dict(n_estimators=100, random_state=42, n_jobs=-1)
+# Au-delà de MAX_TRAIN_ROWS joueurs (jeux générés), la forêt est entraînée sur un
+# échantillon fixe et ses arbres sont bornés : sa taille (mémoire, fichier
+# persisté) ne croît plus avec le nombre de joueurs. En dessous, modèle inchangé.
+MAX_TRAIN_ROWS = 100_000
+LARGE_FOREST_BOUNDS = dict(max_depth=20, min_samples_leaf=20)
+
+# Modèles entraînés, persistés par empreinte des données d'entraînement
+DOSSIER_MODELES = os.environ.get('SCOUTING_MODEL_DIR', 'modeles_scouting')
 
 # Classe pour le modèle de Machine Learning
 class PlayerPotentialModel:
     def __init__(self):
         self.scaler = StandardScaler()
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.kmeans = KMeans(n_clusters=5, random_state=42)
+        self.model = RandomForestRegressor(**FOREST_PARAMS)
         self.is_fitted = False
+        self.tree = None
     
     def train(self, df):
-        features = ['age', 'performance_index', 'ground_defence', 'aerial_play', 
-                   'distribution', 'chance_creation', 'take_on', 'finishing',
-                   'minutes_played', 'goals', 'assists']
-        
-        X = df[features].fillna(0)
-        y = df['transfer_value_avg']
+        if len(df) > MAX_TRAIN_ROWS:
+            df = df.sample(MAX_TRAIN_ROWS, random_state=42)
+            self.model.set_params(**LARGE_FOREST_BOUNDS)
+        X = df[FEATURES].fillna(0)
+        y = df[TARGET]
         
         X_scaled = self.scaler.fit_transform(X)
         self.model.fit(X_scaled, y)
-        self.kmeans.fit(X_scaled)
         self.is_fitted = True
         
         return self
+
+    def save(self, path):
+        """Écrit le scaler et la forêt entraînés (écriture atomique)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        joblib.dump({'scaler': self.scaler, 'model': self.model}, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        artefact = joblib.load(path)
+        instance = cls()
+        instance.scaler = artefact['scaler']
+        instance.model = artefact['model']
+        instance.is_fitted = True
+        return instance
     
     def predict_potential(self, player_data):
         if not self.is_fitted:
@@ -205,27 +180,149 @@ class PlayerPotentialModel:
         potential = (potential_score * 0.4 + age_factor * 30 + performance_factor * 30)
         return min(100, max(0, potential))
     
-    def get_similar_players(self, player_data, df, n_similar=5):
+    def predict_potential_batch(self, df):
+        """Potentiel de tous les joueurs de `df` en une passe (même formule que predict_potential)"""
         if not self.is_fitted:
-            return pd.DataFrame()
-        
-        features = ['age', 'performance_index', 'ground_defence', 'aerial_play', 
-                   'distribution', 'chance_creation', 'take_on', 'finishing',
-                   'minutes_played', 'goals', 'assists']
+            return None
         
-        X = df[features].fillna(0)
-        X_scaled = self.scaler.transform(X)
+        X = self.scaler.transform(df[FEATURES].fillna(0))
+        potential_score = self.model.predict(X)
         
-        # Correction: player_data est déjà un array numpy
-        if isinstance(player_data, np.ndarray):
-            player_scaled = self.scaler.transform(player_data.reshape(1, -1))
-        else:
-            player_scaled = self.scaler.transform(np.array(player_data).reshape(1, -1))
+        age_factor = np.maximum(0, (21 - df['age'].to_numpy()) / 4)
+        performance_factor = df['performance_index'].to_numpy() / 100
         
-        distances = np.sum((X_scaled - player_scaled) ** 2, axis=1)
+        potential = potential_score * 0.4 + age_factor * 30 + performance_factor * 30
+        return np.clip(potential, 0, 100)
+    
+    def build_index(self, df):
+        """Matrice standardisée et KD-tree de tous les joueurs, calculés une fois"""
+        self.X_scaled = self.scaler.transform(df[FEATURES].fillna(0))
+        self.tree = KDTree(self.X_scaled)
+        self.index_labels = df.index
+        return self
+    
+    def get_similar_players(self, player_data, df, n_similar=5):
+        if not self.is_fitted:
+            return pd.DataFrame()
         
-        similar_indices = np.argsort(distances)[1:n_similar+1]
-        return df.iloc[similar_indices]
+        player_scaled = self.scaler.transform(np.asarray(player_data, dtype=float).reshape(1, -1))
+        k = n_similar + 1
+        
+        positions = None if self.tree is None else self.index_labels.get_indexer(df.index)
+        if positions is None or (positions < 0).any():
+            # Joueurs hors index : calcul direct sur le DataFrame fourni
+            X_scaled = self.scaler.transform(df[FEATURES].fillna(0))
+            distances = np.sum((X_scaled - player_scaled) ** 2, axis=1)
+            similar_indices = np.argsort(distances)[1:k]
+            return df.iloc[similar_indices]
+        
+        if len(positions) <= SEUIL_FORCE_BRUTE:
+            # Peu de joueurs filtrés : distances sur les lignes précalculées
+            distances = np.sum((self.X_scaled[positions] - player_scaled) ** 2, axis=1)
+            nearest = positions[np.argsort(distances)[:k]]
+        else:
+            # k plus proches voisins dans le KD-tree, restreints au masque des filtres
+            mask = np.zeros(len(self.index_labels), dtype=bool)
+            mask[positions] = True
+            n_query = k
+            while True:
+                n_query = min(n_query, len(mask))
+                _, nearest = self.tree.query(player_scaled, k=n_query)
+                nearest = nearest[0][mask[nearest[0]]]
+                if len(nearest) >= k or n_query == len(mask):
+                    break
+                n_query *= 4
+            nearest = nearest[:k]
+        
+        return df.loc[self.index_labels[nearest[1:]]]
+
+def training_fingerprint(df):
+    """Empreinte des données d'entraînement, des features et des réglages de la forêt"""
+    h = hashlib.sha256(repr((FEATURES, TARGET, sorted(FOREST_PARAMS.items()), MAX_TRAIN_ROWS,
+                               sorted(LARGE_FOREST_BOUNDS.items()))).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df[FEATURES + [TARGET]], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+# Données d'entraînement et leur empreinte, calculées une fois par processus
+@st.cache_resource
+def load_training_data():
+    df = load_data()
+    return df, training_fingerprint(df)
+
+# Modèle partagé par toutes les sessions du processus, rechargé depuis le disque s'il existe.
+# Le cache est indexé par l'empreinte seule (_df n'est pas haché par Streamlit).
+@st.cache_resource(show_spinner="Chargement du modèle de potentiel...")
+def load_model(fingerprint, _df):
+    path = os.path.join(DOSSIER_MODELES, f"potentiel_{fingerprint[:16]}.joblib")
+    if os.path.exists(path):
+        try:
+            return PlayerPotentialModel.load(path).build_index(_df)
+        except Exception:
+            pass
+    model = PlayerPotentialModel().train(_df)
+    model.save(path)
+    return model.build_index(_df)
+
+# Données avec la colonne 'potential' calculée une fois pour tous les joueurs.
+# Partagées sans copie entre les reruns et les sessions : lecture seule.
+@st.cache_resource(show_spinner="Calcul du potentiel des joueurs...")
+def load_scored_data():
+    df, fingerprint = load_training_data()
+    return df.assign(potential=load_model(fingerprint, df).predict_potential_batch(df))
+
+# Classement : ordre décroissant de tous les joueurs, calculé une fois par colonne
+PAGE_SIZES = [10, 20, 50, 100]
+
+@st.cache_resource
+def ranking_order(column):
+    values = load_scored_data()[column].to_numpy()
+    return np.argsort(-values, kind='stable')
+
+# Listes de sélection des joueurs : au plus MAX_PLAYER_OPTIONS, les mieux classés d'abord
+MAX_PLAYER_OPTIONS = 200
+
+def player_options(df, mask, query):
+    """Positions (dans df) des joueurs filtrés dont le nom contient `query`"""
+    order = ranking_order('performance_index')
+    ranked = order[mask[order]]
+    if query:
+        names = df['name'].to_numpy()[ranked]
+        ranked = ranked[pd.Series(names).str.contains(query, case=False, regex=False).to_numpy()]
+    return ranked[:MAX_PLAYER_OPTIONS].tolist()
+
+# Champ de recherche et liste capée d'un joueur ; renvoie sa ligne dans df
+def select_player(df, mask, label, key):
+    query = st.text_input("Rechercher un joueur (nom)", key=f"{key}_search").strip()
+    options = player_options(df, mask, query)
+    if query and not options:
+        st.warning(f"Aucun joueur ne correspond à « {query} »")
+        options = player_options(df, mask, '')
+    names = df['name'].to_numpy()
+    position = st.selectbox(label, options, format_func=lambda p: names[p], key=key,
+                            help=f"{MAX_PLAYER_OPTIONS} joueurs au plus, par performance décroissante")
+    return df.iloc[position]
+
+# Cartes HTML d'une page du classement (un seul élément envoyé au navigateur)
+def render_leaderboard_page(page_players, first_rank):
+    cards = []
+    for rank, player in enumerate(page_players.itertuples(index=False), first_rank):
+        cards.append(f"""
+                <div class="player-card">
+                    <h3>#{rank} {player.name}</h3>
+                    <div style="display: flex; justify-content: space-between;">
+                        <div>
+                            <p><strong>Club:</strong> {player.club} ({player.league})</p>
+                            <p><strong>Âge:</strong> {player.age:.1f} ans</p>
+                            <p><strong>Catégorie:</strong> {player.category}</p>
+                        </div>
+                        <div>
+                            <p><strong>Performance:</strong> {player.performance_index:.1f}/100</p>
+                            <p><strong>Potentiel IA:</strong> {player.potential:.1f}/100</p>
+                            <p><strong>Valeur estimée:</strong> €{player.transfer_value_min:.1f}M - €{player.transfer_value_max:.1f}M</p>
+                        </div>
+                    </div>
+                </div>""")
+    return "".join(cards)
 
 # Fonction pour créer un radar chart
 def create_radar_chart(player_data, player_name):
@@ -276,12 +373,12 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Chargement des données
-    df = load_data()
+    # Chargement des données (potentiel inclus)
+    df = load_scored_data()
     
-    # Initialisation du modèle ML
-    if 'ml_model' not in st.session_state:
-        st.session_state.ml_model = PlayerPotentialModel().train(df)
+    # Modèle ML (une instance par processus, entraînée une seule fois)
+    training_df, fingerprint = load_training_data()
+    ml_model = load_model(fingerprint, training_df)
     
     # Sidebar pour les filtres
     st.sidebar.header("🔍 Filtres de recherche")
@@ -311,20 +408,28 @@ def main():
         value=60
     )
     
-    # Application des filtres
-    filtered_df = df.copy()
+    min_potential = st.sidebar.slider(
+        "Potentiel IA minimal",
+        min_value=0,
+        max_value=100,
+        value=0
+    )
+    
+    # Application des filtres (masque booléen aligné sur df, sans copie)
+    mask = (
+        (df['age'] >= age_range[0]).to_numpy() &
+        (df['age'] <= age_range[1]).to_numpy() &
+        (df['performance_index'] >= min_performance).to_numpy() &
+        (df['potential'] >= min_potential).to_numpy()
+    )
     
     if selected_category != 'Toutes':
-        filtered_df = filtered_df[filtered_df['category'] == selected_category]
+        mask &= (df['category'] == selected_category).to_numpy()
     
     if selected_league != 'Tous':
-        filtered_df = filtered_df[filtered_df['league'] == selected_league]
+        mask &= (df['league'] == selected_league).to_numpy()
     
-    filtered_df = filtered_df[
-        (filtered_df['age'] >= age_range[0]) & 
-        (filtered_df['age'] <= age_range[1]) &
-        (filtered_df['performance_index'] >= min_performance)
-    ]
+    filtered_df = df[mask]
     
     # Métriques globales
     col1, col2, col3, col4 = st.columns(4)
@@ -355,27 +460,27 @@ def main():
     with tab1:
         st.header("🏆 Classement des meilleurs joueurs")
         
-        # Tri par performance
-        top_players = filtered_df.nlargest(20, 'performance_index')
+        # Tri par performance ou par potentiel IA
+        sort_by = st.radio("Trier par", ["Performance", "Potentiel IA"], horizontal=True)
+        sort_column = 'performance_index' if sort_by == "Performance" else 'potential'
         
-        for idx, player in top_players.iterrows():
-            with st.container():
-                st.markdown(f"""
-                <div class="player-card">
-                    <h3>#{len(top_players) - list(top_players.index).index(idx)} {player['name']}</h3>
-                    <div style="display: flex; justify-content: space-between;">
-                        <div>
-                            <p><strong>Club:</strong> {player['club']} ({player['league']})</p>
-                            <p><strong>Âge:</strong> {player['age']:.1f} ans</p>
-                            <p><strong>Catégorie:</strong> {player['category']}</p>
-                        </div>
-                        <div>
-                            <p><strong>Performance:</strong> {player['performance_index']:.1f}/100</p>
-                            <p><strong>Valeur estimée:</strong> €{player['transfer_value_min']:.1f}M - €{player['transfer_value_max']:.1f}M</p>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        # Classement filtré : ordre global précalculé, restreint au masque des filtres
+        order = ranking_order(sort_column)
+        ranked = order[mask[order]]
+        
+        col_size, col_page = st.columns(2)
+        with col_size:
+            page_size = st.selectbox("Joueurs par page", PAGE_SIZES, index=1)
+        n_pages = max(1, -(-len(ranked) // page_size))
+        with col_page:
+            # Libellé fixe et clé explicite : la page choisie survit à un changement de filtre
+            page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, key="leaderboard_page")
+            st.caption(f"sur {n_pages}")
+        
+        first = (page - 1) * page_size
+        page_players = df.iloc[ranked[first:first + page_size]]
+        st.markdown(render_leaderboard_page(page_players, first + 1), unsafe_allow_html=True)
+        st.caption(f"Joueurs {min(first + 1, len(ranked))}-{first + len(page_players)} sur {len(ranked)}")
     
     with tab2:
         st.header("📊 Analyses statistiques")
@@ -385,6 +490,7 @@ def main():
         with col1:
             # Distribution par catégorie
             category_counts = filtered_df['category'].value_counts()
+            category_counts = category_counts[category_counts > 0]
             fig_cat = px.bar(
                 x=category_counts.values,
                 y=category_counts.index,
@@ -410,7 +516,7 @@ def main():
         
         # Analyse par championnat
         st.subheader("Performance par championnat")
-        league_performance = filtered_df.groupby('league').agg({
+        league_performance = filtered_df.groupby('league', observed=True).agg({
             'performance_index': 'mean',
             'transfer_value_avg': 'mean',
             'name': 'count'
@@ -422,12 +528,7 @@ def main():
         st.header("🎯 Analyse détaillée d'un joueur")
         
         # Sélection du joueur
-        selected_player_name = st.selectbox(
-            "Choisir un joueur",
-            filtered_df['name'].unique()
-        )
-        
-        player_data = filtered_df[filtered_df['name'] == selected_player_name].iloc[0]
+        player_data = select_player(df, mask, "Choisir un joueur", key="detail_player")
         
         # Informations générales
         col1, col2 = st.columns(2)
@@ -473,13 +574,7 @@ def main():
         st.header("🤖 Prédictions et Analyses IA")
         
         # Sélection du joueur pour l'analyse IA
-        selected_player_ai = st.selectbox(
-            "Choisir un joueur pour l'analyse IA",
-            filtered_df['name'].unique(),
-            key="ai_player"
-        )
-        
-        player_ai_data = filtered_df[filtered_df['name'] == selected_player_ai].iloc[0]
+        player_ai_data = select_player(df, mask, "Choisir un joueur pour l'analyse IA", key="ai_player")
         
         # Prédiction du potentiel
         features_for_prediction = np.array([
@@ -496,7 +591,7 @@ def main():
             player_ai_data['assists']
         ])
         
-        potential_score = st.session_state.ml_model.predict_potential(features_for_prediction)
+        potential_score = player_ai_data['potential']
         
         col1, col2 = st.columns(2)
         
@@ -544,7 +639,7 @@ def main():
         # Joueurs similaires
         st.subheader("🔍 Joueurs similaires")
         
-        similar_players = st.session_state.ml_model.get_similar_players(
+        similar_players = ml_model.get_similar_players(
             features_for_prediction,
             filtered_df,
             n_similar=5
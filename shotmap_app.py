@@ -1,27 +1,21 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-import matplotlib.font_manager as fm
-from mplsoccer import VerticalPitch
-from PIL import Image
-import urllib.request
-import numpy as np
-import requests
-import csv
-import time
 from pathlib import Path
 import os
-
-# Configuration de la police Montserrat
-font_url = "https://github.com/googlefonts/Montserrat/raw/main/fonts/ttf/Montserrat-Regular.ttf"
-font_path = 'Montserrat-Regular.ttf'
-if not os.path.exists(font_path):
-    urllib.request.urlretrieve(font_url, font_path)
-
-fm.fontManager.addfont(font_path)
-prop = fm.FontProperties(fname=font_path)
-plt.rcParams['font.family'] = prop.get_name()
+from collecte_fotmob import (
+    get_filename, get_partial_filename, recuperer_ids_matchs_termines, iterer_tirs, lire_ids_existants,
+    CacheReponses, EcrivainTirs, HorsLigneError, HORS_LIGNE_DEFAUT
+)
+from stockage_tirs import charger_tirs
+from index_tirs import ShotIndex
+from classements import (
+    CRITERES, AccumulateurClassement, charger_classement, classement_a_jour,
+    mettre_a_jour_classement, trier_classement
+)
+from rendu_shotmap import LEAGUE_THEMES, COLONNES_SHOTMAP, create_shotmap, images_disponibles, prefetch_assets
+from cache_images import get_asset_store, url_logo_ligue
+from cache_rendu import CacheRendu, empreinte_theme, figure_en_png
+from empreintes import empreinte_fichier
 
 # Configuration de la page
 st.set_page_config(
@@ -169,45 +163,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Configuration des ligues
-LEAGUE_THEMES = {
-    'LIGUE 1': {
-        'name': 'LIGUE 1', 'id': 53, 'slug': 'ligue1',
-        'background': '#000d24', 'accent': '#085eff', 'text': '#ffffff',
-        'gradient': ['#000d24', '#042a70', '#085eff', '#5c95ff', '#ffffff']
-    },
-    'PREMIER LEAGUE': {
-        'name': 'PREMIER LEAGUE', 'id': 47, 'slug': 'premier_league',
-        'background': '#360d3a', 'accent': '#e90052', 'text': '#ffffff',
-        'gradient': ['#360d3a', '#6a1b6e', '#963cff', '#e90052', '#ffffff']
-    },
-    'LA LIGA': {
-        'name': 'LA LIGA', 'id': 87, 'slug': 'la_liga',
-        'background': '#140505', 'accent': '#FF4B44', 'text': '#ffeaea',
-        'gradient': ['#140505', '#5c1210', '#b92b27', '#FF4B44', '#ffffff']
-    },
-    'BUNDESLIGA': {
-        'name': 'BUNDESLIGA', 'id': 54, 'slug': 'bundesliga',
-        'background': '#120203', 'accent': '#D3010C', 'text': '#ffffff',
-        'gradient': ['#120203', '#4a0508', '#9e0b12', '#D3010C', '#ffffff']
-    },
-    'SERIE A': {
-        'name': 'SERIE A', 'id': 55, 'slug': 'serie_a',
-        'background': '#020914', 'accent': '#0578FF', 'text': '#f0f9ff',
-        'gradient': ['#020914', '#032d66', '#0578FF', '#66adff', '#ffffff']
-    },
-    'CHAMPIONS LEAGUE': {
-        'name': 'CHAMPIONS LEAGUE', 'id': 42, 'slug': 'ucl',
-        'background': '#001967', 'accent': '#38bdf8', 'text': '#ffffff',
-        'gradient': ['#001967', '#0f3da8', '#38bdf8', '#a5f3fc', '#ffffff']
-    },
-    'EUROPA LEAGUE': {
-        'name': 'EUROPA LEAGUE', 'id': 73, 'slug': 'uel',
-        'background': '#170f00', 'accent': '#f8ad09', 'text': '#fffbeb',
-        'gradient': ['#170f00', '#5c3d02', '#b47b05', '#f8ad09', '#ffffff']
-    }
-}
-
 SEASONS_CONFIG = {
     '2025/2026':'2025/2026',
     '2024/2025': '2024/2025',
@@ -217,80 +172,14 @@ SEASONS_CONFIG = {
     '2020/2021': '2020/2021'
 }
 
-HEADERS = {
-    'sec-ch-ua-platform': '"Windows"',
-    'Referer': 'https://www.fotmob.com/',
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-    'x-mas': 'eyJib2R5Ijp7InVybCI6Ii9hcGkvZGF0YS9sZWFndWVzP2lkPTUzJmNjb2RlMz1GUkEmc2Vhc29uPTIwMjQlMkYyMDI1IiwiY29kZSI6MTc2NTU0MTU0MzgyOSwiZm9vIjoicHJvZHVjdGlvbjo2YzZiN2M5M2Y1OTE0MDg0ZmYwM2IzMzIwMzRlMzE3MThkZWRjYjYzIn0sInNpZ25hdHVyZSI6IjRFOUZFRjA4RDYwNEM3NERCMkQxMDgzQ0YwMDEzNUI3In0=',
-    'sec-ch-ua': '"Chromium";v="122", "Google Chrome";v="122"',
-    'sec-ch-ua-mobile': '?0'
-}
-
-def get_filename(league_slug, season):
-    """Génère le nom de fichier pour une ligue et saison"""
-    season_clean = season.replace('/', '_')
-    return f"tirs_{league_slug}_{season_clean}.csv"
-
-def recuperer_ids_matchs_termines(league_id, season):
-    """Récupère les IDs des matchs terminés"""
-    season_url = season.replace('/', '%2F')
-    url = f'https://www.fotmob.com/api/data/leagues?id={league_id}&ccode3=FRA&season={season_url}'
-    
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        all_matches = data.get('fixtures', {}).get('allMatches', [])
-        ids_termines = [str(m.get('id')) for m in all_matches if m.get('status', {}).get('finished')]
-        return ids_termines
-    except Exception as e:
-        st.error(f"❌ Erreur API: {str(e)}")
-        return []
-
-def extraire_tirs_match(match_id, league_name, season):
-    """Extrait les tirs d'un match"""
-    url = f'https://www.fotmob.com/api/data/matchDetails?matchId={match_id}'
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        if response.status_code != 200:
-            return []
-        
-        data = response.json()
-        general = data.get('general', {})
-        home = general.get('homeTeam', {}).get('name', 'Domicile')
-        away = general.get('awayTeam', {}).get('name', 'Extérieur')
-        
-        shots = []
-        content = data.get('content', {})
-        
-        if content and 'shotmap' in content and content['shotmap']:
-            for shot in content['shotmap'].get('shots', []):
-                shots.append({
-                    'match_id': match_id,
-                    'ligue': league_name,
-                    'saison': season,
-                    'date': general.get('matchTimeUTC'),
-                    'type_evenement': shot.get('eventType'),
-                    'equipe_id': shot.get('teamId'),
-                    'joueur': shot.get('playerName'),
-                    'equipe_joueur': home if shot.get('teamId') == general.get('homeTeam', {}).get('id') else away,
-                    'joueur_id': shot.get('playerId'),
-                    'minute': shot.get('min'),
-                    'xg': shot.get('expectedGoals'),
-                    'situation': shot.get('situation'),
-                    'position_x': shot.get('x'),
-                    'position_y': shot.get('y'),
-                })
-        return shots
-    except:
-        return []
-
-def lancer_scraping(league_conf, season_str):
+def lancer_scraping(league_conf, season_str, incremental=True, offline=HORS_LIGNE_DEFAUT):
     """Orchestre le scraping avec interface Streamlit"""
     filename = get_filename(league_conf['slug'], season_str)
+    # Cache propre à cette collecte : le mode hors-ligne d'une session n'affecte pas les autres
+    cache = CacheReponses(offline=offline)
     
     st.info(f"🔄 Récupération des matchs pour {league_conf['name']} ({season_str})...")
-    ids = recuperer_ids_matchs_termines(league_conf['id'], season_str)
+    ids = recuperer_ids_matchs_termines(league_conf['id'], season_str, cache=cache)
     
     if not ids:
         st.warning("⚠️ Aucun match trouvé. Vérifiez les headers ou la disponibilité.")
@@ -298,163 +187,120 @@ def lancer_scraping(league_conf, season_str):
     
     st.success(f"✅ {len(ids)} matchs terminés trouvés")
     
-    all_data = []
+    # Mode incrémental : seuls les matchs absents du CSV sont téléchargés
+    append = incremental and Path(filename).exists()
+    classement_etait_a_jour = append and classement_a_jour(filename)
+    
+    # Reprise d'une collecte interrompue : le fichier .part (réparé par l'écrivain) contient déjà ces matchs
+    writer = None
+    if os.path.exists(get_partial_filename(filename)):
+        writer = EcrivainTirs(filename, append=append)
+        classement_etait_a_jour = False
+        st.info("♻️ Reprise d'une collecte interrompue")
+        deja_collectes = writer.ids_ecrits()
+    else:
+        # Le CSV n'est copié dans le .part que s'il y a des matchs à ajouter
+        deja_collectes = lire_ids_existants(filename) if append else set()
+    
+    nb_matchs = len(ids)
+    ids = [mid for mid in ids if mid not in deja_collectes]
+    if not ids and writer is not None:
+        st.info("✅ Tous les matchs étaient déjà téléchargés")
+    elif not ids:
+        st.success("✅ Données déjà à jour")
+        return filename
+    elif len(ids) < nb_matchs:
+        st.info(f"➕ {len(ids)} nouveaux matchs à collecter")
+    
+    if writer is None:
+        writer = EcrivainTirs(filename, append=append)
+    
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    for i, mid in enumerate(ids, 1):
-        match_shots = extraire_tirs_match(mid, league_conf['name'], season_str)
-        all_data.extend(match_shots)
-        progress_bar.progress(i / len(ids))
-        status_text.text(f"⏳ Progression: {i}/{len(ids)} | Tirs cumulés: {len(all_data)}")
-        time.sleep(0.3)
+    def on_progress(done, total, nb_tirs):
+        progress_bar.progress(done / total)
+        status_text.text(f"⏳ Progression: {done}/{total} | Tirs cumulés: {nb_tirs}")
+    
+    # Écriture au fil de l'eau : la mémoire ne dépend pas de la taille de la saison
+    accumulateur = AccumulateurClassement()
+    try:
+        for mid, shots in iterer_tirs(ids, league_conf['name'], season_str, on_progress=on_progress, cache=cache):
+            writer.ecrire(shots)
+            accumulateur.ajouter(shots)
+    except HorsLigneError as e:
+        # Rien n'est publié : le .part garde les matchs complets pour une reprise
+        progress_bar.empty()
+        status_text.empty()
+        st.error(f"❌ Collecte interrompue, match absent du cache hors-ligne ({e})")
+        return None
+    finally:
+        writer.fermer()
     
     progress_bar.empty()
     status_text.empty()
     
-    if all_data:
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=all_data[0].keys())
-            writer.writeheader()
-            writer.writerows(all_data)
-        st.success(f"🎉 Données collectées: ({len(all_data)} tirs)")
+    if writer.valider():
+        mettre_a_jour_classement(filename, accumulateur.to_frame(), classement_etait_a_jour)
+        load_data.clear()
+        load_index.clear()
+        load_classement.clear()
+        classement_trie.clear()
+        st.success(f"🎉 Données collectées: ({writer.nb_tirs} tirs)")
         return filename
     else:
         st.error("❌ Aucun tir récupéré")
         return None
 
 @st.cache_data
-def load_data(file_path):
-    """Charge les données depuis CSV"""
+def load_data(file_path, columns=tuple(COLONNES_SHOTMAP)):
+    """Charge les données typées depuis le stockage Parquet (ou le CSV)"""
     try:
-        data = pd.read_csv(file_path)
+        data = charger_tirs(file_path, list(columns))
         data = data[data['situation'] != 'Penalty'].reset_index(drop=True)
         return data
     except:
         return None
 
-def semicircle(r, h, k):
-    """Génère un demi-cercle"""
-    x0, x1 = h - r, h + r
-    x = np.linspace(x0, x1, 500)
-    y = k - np.sqrt(r**2 - (x - h)**2)
-    return x, y
+@st.cache_resource
+def load_index(file_path, team):
+    """Index des tirs par joueur, construit une fois par fichier et équipe"""
+    data = load_data(file_path)
+    if team != 'Toutes les équipes':
+        data = data[data['equipe_joueur'] == team]
+    return ShotIndex(data)
 
-def create_shotmap(data, player_id, theme, player_info, size='normal'):
-    """Crée une carte de tirs avec photo du joueur et barre de densité"""
-    if size == 'large':
-        figsize = (10, 13)
-        font_sizes = {'title': 14, 'stats_label': 8, 'stats_value': 14, 'distance': 9}
-    else:
-        figsize = (6, 8)
-        font_sizes = {'title': 10, 'stats_label': 6, 'stats_value': 10, 'distance': 7}
-    
-    fig, ax = plt.subplots(figsize=figsize, facecolor=theme['background'])
-    ax.set_facecolor(theme['background'])
-    
-    pitch = VerticalPitch(
-        pitch_type='uefa', half=True, goal_type='box',
-        linewidth=1.5, line_color=mcolors.to_hex(mcolors.to_rgba(theme['text'], alpha=0.2)),
-        pad_bottom=-10, pad_top=15, pitch_color=theme['background']
-    )
-    pitch.draw(ax=ax)
-    
-    player_data = data[data['joueur_id'] == player_id]
-    cmap = mcolors.LinearSegmentedColormap.from_list('LeagueTheme', theme['gradient'], N=100)
-    
-    # Hexbins améliorés avec bordures blanches épaisses et alpha élevé
-    hexbin = pitch.hexbin(
-        x=player_data['position_x'], y=player_data['position_y'], 
-        ax=ax, cmap=cmap, gridsize=(16, 16), zorder=2, 
-        edgecolors='white', linewidths=1.8, alpha=1.0, mincnt=1
-    )
-    
-    median_x = player_data['position_x'].median()
-    x_circle, y_circle = semicircle(104.8 - median_x, 34, 104.8)
-    ax.plot(x_circle, y_circle, ls='--', color=theme['accent'], lw=2, alpha=0.6, zorder=3)
-    
-    stats = {
-        'TIRS': player_data.shape[0],
-        'BUTS': player_data[player_data['type_evenement'] == 'Goal'].shape[0],
-        'xG': player_data['xg'].sum(),
-        'xG/TIR': player_data['xg'].mean()
-    }
-    
-    on_target = player_data[player_data['type_evenement'].isin(['Goal', 'SavedShot'])].shape[0]
-    accuracy = (on_target / stats['TIRS'] * 100) if stats['TIRS'] > 0 else 0
-    
-    stat_y_start = 60
-    for i, (label, value) in enumerate(stats.items()):
-        x_pos = 10 + (i * 14.5)
-        ax.text(x_pos, stat_y_start, label, 
-                ha='center', va='bottom', fontsize=font_sizes['stats_label'], 
-                color=mcolors.to_hex(mcolors.to_rgba(theme['text'], alpha=0.6)), 
-                weight='bold', fontfamily='Montserrat')
-        val_fmt = f"{value:.0f}" if label in ['TIRS', 'BUTS'] else f"{value:.2f}"
-        ax.text(x_pos, stat_y_start - 2, val_fmt, 
-                ha='center', va='top', fontsize=font_sizes['stats_value'], 
-                color=theme['accent'], weight='heavy', fontfamily='Montserrat')
-    
-    dist_yds = ((105 - median_x) * 18) / 16.5
-    dist_m = dist_yds * 0.9144
-    
-    info_text = f"Distance Médiane: {dist_m:.1f}m  |  Précision: {accuracy:.0f}%"
-    ax.text(34, 108, info_text,
-            ha='center', va='center', fontsize=font_sizes['distance'],
-            color=theme['text'], weight='bold', fontfamily='Montserrat',
-            bbox=dict(facecolor=theme['background'], edgecolor=theme['accent'], 
-                     boxstyle='round,pad=0.5', alpha=0.9, linewidth=2))
-    
-    # Titre avec nom du joueur
-    player_name = player_info['joueur'].upper()
-    ax.text(34, 120, player_name, 
-            ha='center', va='center', fontsize=font_sizes['title'], 
-            color=theme['text'], weight='black', fontfamily='Montserrat',
-            bbox=dict(facecolor=theme['background'], edgecolor='none', 
-                     boxstyle='round,pad=0.7', alpha=0.8))
-    
-    # Sous-titre avec équipe et saison
-    team_name = player_info['equipe_joueur']
-    season = player_info['saison']
-    subtitle_text = f"{team_name} | {season}"
-    ax.text(34, 115, subtitle_text, 
-            ha='center', va='center', fontsize=font_sizes['distance'], 
-            color=mcolors.to_hex(mcolors.to_rgba(theme['text'], alpha=0.7)), 
-            weight='semibold', fontfamily='Montserrat')
-    
-    ax.plot([20, 48], [112, 112], color=theme['accent'], lw=3, alpha=0.9)
-    
-    # Logo de l'équipe
-    team_id = player_data["equipe_id"].iloc[0]
-    try:
-        logo_ax = ax.inset_axes([0.05, 0.88, 0.15, 0.15])
-        icon = Image.open(urllib.request.urlopen(
-            f'https://images.fotmob.com/image_resources/logo/teamlogo/{team_id:.0f}.png'
-        ))
-        logo_ax.imshow(icon)
-        logo_ax.axis('off')
-    except:
-        pass
-    
-    # Photo du joueur
-    try:
-        player_logo_ax = ax.inset_axes([0.80, 0.88, 0.15, 0.15])
-        player_icon_url = f'https://images.fotmob.com/image_resources/playerimages/{player_id}.png'
-        player_icon = Image.open(urllib.request.urlopen(player_icon_url))
-        player_logo_ax.imshow(player_icon)
-        player_logo_ax.axis('off')
-    except Exception as e:
-        pass
-    
-    # Description des hexbins en bas de la shotmap
-    density_text = "Hexbins : plus la couleur est claire, plus la fréquence de tirs est élevée"
-    ax.text(34, 50, density_text,
-            ha='center', va='center', fontsize=font_sizes['distance']-1,
-            color=mcolors.to_hex(mcolors.to_rgba(theme['text'], alpha=0.7)), 
-            style='italic', fontfamily='Montserrat')
-    
-    plt.tight_layout()
-    return fig
+@st.cache_resource
+def get_render_cache():
+    """Cache LRU des shotmaps rendues, partagé entre toutes les sessions"""
+    return CacheRendu()
+
+def render_shotmap(file_path, team, index, player_id, theme, player_info, size):
+    """PNG d'une shotmap, servi depuis le cache si rien n'a changé"""
+    cache = get_render_cache()
+    key = (theme['slug'], player_info['saison'], team, int(player_id), player_info['equipe_joueur'],
+           size, empreinte_theme(theme), empreinte_fichier(file_path))
+    png = cache.get(key)
+    if png is None:
+        fig = create_shotmap(index, player_id, theme, player_info, size=size)
+        png = figure_en_png(fig)
+        plt.close(fig)
+        # Carte rendue sans logo ou sans photo (échec de téléchargement) : pas mise en
+        # cache, pour être redessinée quand l'image redevient disponible
+        if images_disponibles(index, player_id):
+            cache.put(key, png)
+    return png
+
+@st.cache_data
+def load_classement(file_path):
+    """Classement matérialisé (tirs, buts, xG) par joueur et équipe"""
+    return charger_classement(file_path, lambda: load_data(file_path))
+
+@st.cache_data
+def classement_trie(file_path, team, display_type):
+    """Classement d'une équipe (ou de toute la compétition) trié pour un type d'analyse"""
+    equipe = None if team == 'Toutes les équipes' else team
+    return trier_classement(load_classement(file_path), CRITERES[display_type], equipe)
 
 def main():
     st.markdown("# Analyse des Zones de Tir")
@@ -480,12 +326,12 @@ def main():
         theme = LEAGUE_THEMES[selected_league_name]
         
         # Logo de la ligue
-        try:
-            league_url = f'https://images.fotmob.com/image_resources/logo/leaguelogo/{theme["id"]}.png'
+        league_logo = get_asset_store().get(url_logo_ligue(theme['id']))
+        if league_logo is not None:
             col1, col2, col3 = st.columns([1,2,1])
             with col2:
-                st.image(league_url, use_container_width=True)
-        except:
+                st.image(league_logo, use_container_width=True)
+        else:
             st.markdown(f"### {theme['name']}")
         
         st.markdown("---")
@@ -498,9 +344,21 @@ def main():
                 index=0
             )
             
+            incremental = st.checkbox(
+                "Collecte incrémentale",
+                value=True,
+                help="Ne télécharge que les matchs absents du fichier existant"
+            )
+            
+            offline = st.checkbox(
+                "Mode hors-ligne",
+                value=HORS_LIGNE_DEFAUT,
+                help="Rejoue uniquement les réponses FotMob déjà en cache, sans accès réseau"
+            )
+            
             if st.button("🚀 Lancer la collecte"):
                 with st.spinner("Collecte en cours..."):
-                    filename = lancer_scraping(theme, selected_season)
+                    filename = lancer_scraping(theme, selected_season, incremental=incremental, offline=offline)
                     if filename:
                         st.session_state['last_scraped_file'] = filename
         
@@ -605,27 +463,10 @@ def main():
         
         # Shotmaps
         st.markdown("## 🎯 Shotmaps Détaillées")
+        index = load_index(filename, selected_team)
         
-        # Préparation données pour shotmaps
-        if display_type == "Top Tireurs":
-            data_grouped = filtered_data.groupby(['joueur_id', 'joueur', 'equipe_id', 'equipe_joueur']).agg({
-                'saison': 'first'
-            }).reset_index()
-            data_grouped['Total'] = filtered_data.groupby(['joueur_id', 'joueur', 'equipe_id', 'equipe_joueur']).size().values
-        elif display_type == "Meilleurs Buteurs":
-            goals_data = filtered_data[filtered_data['type_evenement'] == 'Goal']
-            data_grouped = goals_data.groupby(['joueur_id', 'joueur', 'equipe_id', 'equipe_joueur']).agg({
-                'saison': 'first'
-            }).reset_index()
-            data_grouped['Total'] = goals_data.groupby(['joueur_id', 'joueur', 'equipe_id', 'equipe_joueur']).size().values
-        else:
-            data_grouped = filtered_data.groupby(['joueur_id', 'joueur', 'equipe_id', 'equipe_joueur']).agg({
-                'xg': 'sum',
-                'saison': 'first'
-            }).reset_index()
-            data_grouped.rename(columns={'xg': 'Total'}, inplace=True)
-        
-        data_grouped = data_grouped.sort_values(by='Total', ascending=False).head(num_players)
+        # Classement matérialisé : simple lecture en cache
+        data_grouped = classement_trie(filename, selected_team, display_type).head(num_players)
         
         if len(data_grouped) == 0:
             st.warning("⚠️ Aucun joueur ne correspond aux critères sélectionnés.")
@@ -641,6 +482,9 @@ def main():
             cols_per_row = 3
             size = 'normal'
         
+        # Logos et photos de toute la grille téléchargés en parallèle avant le rendu
+        prefetch_assets(index, data_grouped['joueur_id'].tolist())
+        
         rows = (num_players + cols_per_row - 1) // cols_per_row
         
         for row in range(rows):
@@ -656,9 +500,9 @@ def main():
                     }
                     with cols[col_idx]:
                         with st.spinner(f"🎨 Génération..."):
-                            fig = create_shotmap(filtered_data, player_id, theme, player_info, size=size)
-                            st.pyplot(fig, use_container_width=True)
-                            plt.close(fig)
+                            png = render_shotmap(filename, selected_team, index, player_id,
+                                                 theme, player_info, size)
+                            st.image(png, use_container_width=True)
         
         # Footer
         st.markdown("---")
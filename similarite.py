@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+# Liste des features sélectionnées
+SELECTED_FEATURES = [
+    'Matchs joues', 'Titularisations', 'Minutes jouees', 'Matches equivalents 90 minutes', 'Buts',
+    'Passes decisives', 'Buts + Passes decisives', 'Buts hors penalty', 'Penalty marques', 'Penalty tentes',
+    'Cartons jaunes', 'Cartons rouges', 'Buts attendus (xG)', 'Buts attendus hors penalty (npxG)',
+    'Passes decisives attendues (xAG)', 'xG + xAG hors penalty', 'Passes progressives', 'Courses progressives',
+    'Receptions progressives', 'Buts par 90 minutes', 'Passes decisives par 90 minutes', 'Buts + Passes decisives par 90 minutes',
+    'Buts hors penalty par 90 minutes', 'Buts + Passes decisives hors penalty par 90 min', 'xG par 90 minutes', 'xAG par 90 minutes',
+    'xG + xAG par 90 minutes', 'npxG par 90 minutes', 'npxG + xAG par 90 minutes', 'Actions menant a un tir',
+    'Actions menant a un tir par 90 minutes', 'Passes vivantes menant a un tir', 'Passes arretees menant a un tir',
+    'Ballons perdus menant a un tir', 'Tirs menant a un tir', 'Fautes subies menant a un tir', 'Actions defensives menant a un tir',
+    'Actions menant a un but', 'Actions menant a un but par 90 minutes', 'Passes vivantes menant a un but',
+    'Passes arretees menant a un but', 'Ballons perdus menant a un but', 'Tirs menant a un but', 'Fautes subies menant a un but',
+    'Actions defensives menant a un but', 'Passes reussies totales', 'Passes tentees totales',
+    'Pourcentage de reussite des passes', 'Distance totale des passes', 'Distance progressive des passes',
+    'Passes courtes reussies', 'Passes courtes tentees', 'Pourcentage de reussite des passes courtes',
+    'Passes moyennes reussies', 'Passes moyennes tentees', 'Pourcentage de reussite des passes moyennes',
+    'Passes longues reussies', 'Passes longues tentees', 'Pourcentage de reussite des passes longues', 'Passes attendues',
+    'Difference entre passes attendues et xAG', 'Passes cles', 'Passes vers le dernier tiers', 'Passes dans la surface adverse',
+    'Centres dans la surface adverse', 'Deuxieme carton jaune', 'Fautes commises', 'Fautes subies', 'Hors-jeux', 'Centres',
+    'Tacles reussis', 'Penalty obtenus', 'Penalty concedes', 'Buts contre son camp',
+    'Ballons recuperes', 'Duels aeriens gagnes', 'Duels aeriens perdus', 'Pourcentage de duels aeriens gagnes', 'Tirs',
+    'Tirs cadres', 'Pourcentage de tirs cadres', 'Tirs par 90 minutes', 'Tirs cadres par 90 minutes', 'Buts par tir',
+    'Buts par tir cadre', 'Distance moyenne des tirs', 'Coups francs', 'npxG par tir', 'Difference entre buts reels et xG',
+    'Difference entre buts reels hors penalty et npxG', 'Tacles', 'Tacles dans le tiers defensif', 'Tacles dans le tiers median',
+    'Tacles dans le tiers offensif', 'Tacles dans les duels', 'Duels tentes', 'Pourcentage de tacles reussis Tkl%', 'Duels perdus',
+    'Contres', 'Tirs contres', 'Passes contrees', 'Interceptions', 'Tacles + Interceptions', 'Degagements',
+    'Erreurs ayant conduit a un tir adverse', 'Minutes par match', 'Pourcentage de minutes jouees', 'Minutes par titularisation ',
+    'Matches completes', 'Remplacants', 'Minutes par entree', 'Matches non remplace', 'Points par match', 'Buts marques avec le joueur',
+    'Buts encaisses avec le joueur', 'Difference de buts avec le joueur', 'Difference de buts par 90 minutes',
+    'Difference avec/sans le joueur', 'xG marques avec le joueur ', 'xG encaisses avec le joueur', 'Difference de xG avec le joueur',
+    'Difference de xG par 90 minutes', 'Difference de xG avec/sans le joueur', 'Touches', 'Touches dans la surface defensive',
+    'Touches dans le tiers defensif', 'Touches dans le tier median', 'Touches dans le tiers offensif',
+    'Touches dans la surface offensive', 'Ballons en jeu', 'Dribbles tentes', 'Dribbles reussis', 'Pourcentage de dribbles reussis',
+    'Ballons perdus apres dribble', 'Pourcentage de ballons perdus apres dribble', 'Portees de balle',
+    'Distance totale parcourue avec le ballon', 'Distance progressive parcourue avec le ballon',
+    'Courses vers le dernier tiers', 'Courses dans la surface adverse'
+]
+
+# Groupes de features pour la similarité pondérée : (groupe, mots-clés), testés dans l'ordre
+REGLES_GROUPES = [
+    ('Création', ['menant a un']),
+    ('Impact collectif', ['avec le joueur', 'avec/sans', 'Difference de buts', 'Points par match']),
+    ('Défense', ['Tacle', 'tacles', 'Interceptions', 'Contres', 'contres', 'contrees', 'Degagements', 'Duels', 'duels',
+                 'Ballons recuperes', 'Erreurs', 'Penalty concedes']),
+    ('Passe', ['Passe', 'passes', 'Centres', 'xAG']),
+    ('Conduite', ['Touches', 'Dribbles', 'dribble', 'Portees', 'Courses', 'ballon', 'Receptions',
+                  'Ballons en jeu', 'Hors-jeux', 'Penalty obtenus']),
+    ('Finition', ['But', 'Tir', 'tir', 'xG', 'Penalty', 'Coups francs']),
+]
+GROUPE_DEFAUT = 'Temps de jeu et discipline'
+
+
+def groupes_features(features):
+    """{groupe: [features]} selon REGLES_GROUPES, dans l'ordre des règles"""
+    groupes = {nom: [] for nom, _ in REGLES_GROUPES}
+    groupes[GROUPE_DEFAUT] = []
+    for feature in features:
+        groupe = next((nom for nom, mots in REGLES_GROUPES if any(m in feature for m in mots)), GROUPE_DEFAUT)
+        groupes[groupe].append(feature)
+    return {nom: cols for nom, cols in groupes.items() if cols}
+
+
+def ordonner_par_groupe(features):
+    """Features rangées groupe par groupe : chaque groupe occupe des colonnes contiguës"""
+    return [feature for cols in groupes_features(features).values() for feature in cols]
+
+
+def ajuster_echelle(df, features):
+    """Paramètres de preparer_features : moyennes (valeurs manquantes) et MinMaxScaler"""
+    moyennes = df[features].mean()
+    scaler = MinMaxScaler().fit(df[features].fillna(moyennes))
+    return {'moyennes': moyennes.to_numpy(dtype=np.float64), 'scale': scaler.scale_, 'min': scaler.min_}
+
+
+def preparer_features(df, features, echelle=None):
+    """Matrice des features : valeurs manquantes remplacées par la moyenne, puis MinMaxScaler.
+
+    Avec `echelle` (sortie de ajuster_echelle), les paramètres ne sont pas
+    réajustés sur `df` : une ligne garde le même vecteur quand le pool change.
+    """
+    if echelle is None:
+        echelle = ajuster_echelle(df, features)
+    valeurs = df[features].fillna(pd.Series(echelle['moyennes'], index=features)).to_numpy(dtype=np.float64)
+    valeurs *= echelle['scale']
+    valeurs += echelle['min']
+    return valeurs
+
+
+def normaliser_l2(X):
+    """Lignes de X ramenées à une norme 1 (float32) ; les lignes nulles restent nulles"""
+    X = np.asarray(X, dtype=np.float32)
+    normes = np.linalg.norm(X, axis=1, keepdims=True)
+    normes[normes == 0] = 1
+    return X / normes
+
+
+def selection_top_k(scores, k):
+    """Positions des `k` meilleurs scores sur le dernier axe (1D ou une ligne par requête).
+
+    Ordre : score décroissant, puis position croissante pour les ex æquo,
+    y compris au k-ième rang. Une requête seule et un bloc de requêtes
+    (export_similarites) renvoient donc les mêmes voisins.
+    """
+    scores = np.asarray(scores)
+    k = min(k, scores.shape[-1])
+    if k == 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    lignes = scores.reshape(-1, scores.shape[-1])
+    meilleurs = np.argpartition(-lignes, k - 1, axis=1)[:, :k]
+    sous = np.take_along_axis(lignes, meilleurs, axis=1)
+    ex_aequo = (lignes >= sous.min(axis=1, keepdims=True)).sum(axis=1) > k
+    for r in np.flatnonzero(ex_aequo):
+        # Ex æquo au k-ième rang : argpartition choisit au hasard, le tri stable garde les premières positions
+        meilleurs[r] = np.argsort(-lignes[r], kind='stable')[:k]
+        sous[r] = lignes[r, meilleurs[r]]
+    ordre = np.lexsort((meilleurs, -sous), axis=-1)
+    return np.take_along_axis(meilleurs, ordre, axis=1).reshape(scores.shape[:-1] + (k,))
+
+
+def _top_k_candidats(scores, k, candidats=None):
+    """Indices (et scores) des `k` meilleurs `scores` parmi `candidats` (indices ou masque booléen)"""
+    if candidats is None:
+        candidats = np.arange(len(scores))
+    elif candidats.dtype == bool:
+        candidats = np.flatnonzero(candidats)
+    sous_scores = scores[candidats]
+    meilleurs = selection_top_k(sous_scores, k)
+    return candidats[meilleurs], sous_scores[meilleurs]
+
+
+class MoteurSimilarite:
+    """Recherche des joueurs les plus proches au sens de la similarité cosinus.
+
+    Seule la matrice des features normalisées L2 (float32, N × d) est gardée :
+    une requête est un produit matrice-vecteur suivi d'un argpartition, sans
+    jamais construire la matrice N × N. Si un index approximatif est attaché
+    (`ann`, voir index_ann.IndexIVF), les requêtes ne parcourent que les
+    listes qu'il sonde.
+    """
+
+    def __init__(self, X):
+        self.X = normaliser_l2(X)
+        self.ann = None
+
+    def __len__(self):
+        return self.X.shape[0]
+
+    def scores(self, i):
+        """Similarité cosinus du joueur `i` avec tous les joueurs"""
+        return self.X @ self.X[i]
+
+    def top_k(self, i, k, candidats=None):
+        """Indices (et scores) des `k` joueurs les plus similaires à `i`, triés.
+
+        `candidats` restreint la recherche (tableau d'indices ou masque booléen).
+        """
+        if self.ann is not None:
+            if candidats is not None and candidats.dtype != bool:
+                masque = np.zeros(len(self), dtype=bool)
+                masque[candidats] = True
+                candidats = masque
+            return self.ann.rechercher(self.X, self.X[i], k, candidats=candidats)
+
+        return _top_k_candidats(self.scores(i), k, candidats)
+
+
+def _colonnes(cols):
+    """Tranche si les colonnes sont contiguës (X[:, tranche] est une vue), sinon la liste"""
+    cols = list(cols)
+    if cols == list(range(cols[0], cols[0] + len(cols))):
+        return slice(cols[0], cols[0] + len(cols))
+    return cols
+
+
+class MoteurGroupes:
+    """Similarité cosinus pondérée par groupe de features.
+
+    Pour des poids w_g par groupe, la similarité entre a et b vaut
+    Σ w_g a_g·b_g / (√Σ w_g |a_g|² · √Σ w_g |b_g|²). Les normes par groupe
+    sont précalculées (N × G) et les produits par groupe d'un joueur requête
+    (N × G) sont gardés : changer les poids ne coûte qu'un produit N × G.
+    Avec tous les poids à 1, on retrouve la similarité de MoteurSimilarite.
+
+    La similarité ne change pas si une ligne est multipliée par une
+    constante : le moteur peut travailler sur la matrice normalisée d'un
+    MoteurSimilarite. Un groupe de colonnes contiguës est une vue de X, sans
+    copie (voir ordonner_par_groupe) ; sinon ses colonnes sont copiées.
+    """
+
+    def __init__(self, X, groupes):
+        X = np.asarray(X, dtype=np.float32)
+        self.groupes = list(groupes)
+        self.blocs = [X[:, _colonnes(cols)] for cols in groupes.values()]
+        self.normes2 = np.stack([np.einsum('ij,ij->i', bloc, bloc) for bloc in self.blocs], axis=1)
+        self._requete = None
+
+    @classmethod
+    def depuis_moteur(cls, moteur, features):
+        """Moteur sur la matrice de `moteur` (colonnes `features`), groupée par groupes_features"""
+        position = {f: j for j, f in enumerate(features)}
+        groupes = {g: [position[f] for f in cols] for g, cols in groupes_features(features).items()}
+        return cls(moteur.X, groupes)
+
+    def __len__(self):
+        return self.normes2.shape[0]
+
+    def produits(self, i):
+        """Produits scalaires par groupe du joueur `i` avec tous les joueurs (N × G)"""
+        requete = self._requete
+        if requete is None or requete[0] != i:
+            requete = (i, np.stack([bloc @ bloc[i] for bloc in self.blocs], axis=1))
+            self._requete = requete
+        return requete[1]
+
+    def scores(self, i, poids=None):
+        """Similarité pondérée de `i` avec tous les joueurs ; `poids` : {groupe: w}"""
+        poids = poids or {}
+        w = np.array([poids.get(g, 1.0) for g in self.groupes], dtype=np.float32)
+        normes = np.sqrt(self.normes2 @ w)
+        denominateur = normes * normes[i]
+        denominateur[denominateur == 0] = 1
+        return (self.produits(i) @ w) / denominateur
+
+    def top_k(self, i, k, poids=None, candidats=None):
+        """Indices (et scores) des `k` joueurs les plus similaires à `i` pour ces poids"""
+        return _top_k_candidats(self.scores(i, poids), k, candidats)
@@ -0,0 +1,105 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Stockage colonnaire des tirs : un fichier Parquet par (ligue, saison)
+DOSSIER_PARQUET = 'tirs_parquet'
+
+COLONNES_CATEGORIELLES = [
+    'ligue', 'saison', 'date', 'type_evenement', 'equipe_couleur',
+    'joueur', 'equipe_joueur', 'situation'
+]
+COLONNES_FLOAT32 = ['xg', 'position_x', 'position_y']
+COLONNES_BOOLEENNES = ['cadre']
+COLONNES_ENTIERES = {'match_id': 'int32', 'equipe_id': 'int32', 'joueur_id': 'int32', 'minute': 'int16'}
+
+_NOM_CSV = re.compile(r"tirs_(?P<slug>.+)_(?P<saison>\d{4}_\d{4})\.csv$")
+
+
+def get_parquet_path(league_slug, season, dossier=DOSSIER_PARQUET):
+    """Chemin de la partition Parquet d'une ligue et d'une saison"""
+    season_clean = season.replace('/', '_')
+    return os.path.join(dossier, f"ligue={league_slug}", f"saison={season_clean}", "tirs.parquet")
+
+
+def parse_filename(csv_path):
+    """Renvoie (slug, saison) à partir d'un nom tirs_<slug>_<saison>.csv"""
+    match = _NOM_CSV.search(os.path.basename(csv_path))
+    if not match:
+        raise ValueError(f"Nom de fichier de tirs non reconnu : {csv_path}")
+    return match.group('slug'), match.group('saison').replace('_', '/')
+
+
+def _entier(serie, dtype):
+    """Entier compact, nullable uniquement si la colonne contient des NaN"""
+    serie = pd.to_numeric(serie, errors='coerce')
+    if serie.isna().any():
+        return serie.astype(dtype.capitalize())
+    return serie.astype(dtype)
+
+
+def typer_tirs(data):
+    """Applique les types compacts aux colonnes connues"""
+    for col in COLONNES_CATEGORIELLES:
+        if col in data.columns:
+            data[col] = data[col].astype('category')
+    for col in COLONNES_FLOAT32:
+        if col in data.columns:
+            data[col] = pd.to_numeric(data[col], errors='coerce').astype(np.float32)
+    for col, dtype in COLONNES_ENTIERES.items():
+        if col in data.columns:
+            data[col] = _entier(data[col], dtype)
+    for col in COLONNES_BOOLEENNES:
+        if col in data.columns:
+            data[col] = data[col].astype('boolean')
+    return data
+
+
+def convertir_csv(csv_path, dossier=DOSSIER_PARQUET):
+    """Convertit un CSV de tirs en partition Parquet typée et renvoie son chemin"""
+    slug, season = parse_filename(csv_path)
+    data = pd.read_csv(csv_path)
+    if 'saison' not in data.columns:
+        data['saison'] = season
+    data = typer_tirs(data)
+
+    path = get_parquet_path(slug, season, dossier)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    data.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def charger_tirs(csv_path, columns=None, dossier=DOSSIER_PARQUET):
+    """Charge les tirs d'un fichier en ne lisant que `columns`.
+
+    La partition Parquet est (re)générée si elle est absente ou plus ancienne
+    que le CSV. Sans pyarrow, le CSV est lu directement avec les mêmes types.
+    """
+    slug, season = parse_filename(csv_path)
+    path = get_parquet_path(slug, season, dossier)
+
+    try:
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(csv_path):
+            convertir_csv(csv_path, dossier)
+        if columns is not None:
+            import pyarrow.parquet as pq
+            schema = pq.read_schema(path).names
+            columns = [col for col in columns if col in schema]
+        return pd.read_parquet(path, columns=columns)
+    except ImportError:
+        header = pd.read_csv(csv_path, nrows=0).columns
+        usecols = None if columns is None else [col for col in columns if col in header]
+        data = pd.read_csv(csv_path, usecols=usecols)
+        if (columns is None or 'saison' in columns) and 'saison' not in data.columns:
+            data['saison'] = season
+        return typer_tirs(data)
+
+
+if __name__ == "__main__":
+    for csv_path in sorted(glob.glob("tirs_*.csv")):
+        print(f"{csv_path} -> {convertir_csv(csv_path)}")